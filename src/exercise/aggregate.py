@@ -0,0 +1,70 @@
+from operator import itemgetter
+
+SUM_KEYS = ['NewConfirmed', 'TotalConfirmed', 'NewDeaths', 'TotalDeaths']
+LEVELS = ['region', 'subregion']
+UNKNOWN = 'Unknown'
+
+def groupAccumulators(groups, data, numKeys):
+  # Population and the country count are added once per distinct code.
+  accumulators = []
+  for level, levelGroups in groups.items():
+    name = data.get(level) or UNKNOWN
+    totals = levelGroups.get(name)
+    if totals is None:
+      totals = levelGroups[name] = [0] * (numKeys + 2)
+    totals[numKeys] += data.get('population') or 0
+    totals[numKeys + 1] += 1
+    accumulators.append(totals)
+  return accumulators
+
+def aggregateCountries(countries, metadata, levels=LEVELS, sumKeys=SUM_KEYS,
+                       rankBy='TotalConfirmed'):
+  # Joins each summary row to its metadata through the code -> metadata
+  # dict and adds it to one group per level in the same pass, so the cost
+  # is linear in the number of rows. Groups are then few enough that rates
+  # and ranks are computed over them directly.
+  groups = {level: {} for level in levels}
+  numKeys = len(sumKeys)
+  getValues = itemgetter(*sumKeys)
+  # Group accumulators per country code, resolved on the first row of each
+  # code so that later rows skip the metadata and group lookups.
+  targets = {}
+  for country in countries:
+    code = country['CountryCode']
+    accumulators = targets.get(code)
+    if accumulators is None:
+      data = metadata.get(code.upper()) or {}
+      accumulators = targets[code] = groupAccumulators(groups, data, numKeys)
+    values = getValues(country) if numKeys > 1 else (getValues(country),)
+    for totals in accumulators:
+      for i, value in enumerate(values):
+        totals[i] += value
+
+  result = {}
+  for level, levelGroups in groups.items():
+    rows = []
+    for name, totals in levelGroups.items():
+      row = {level.capitalize(): name, 'Countries': totals[numKeys + 1],
+             'Population': totals[numKeys]}
+      row.update(zip(sumKeys, totals))
+      for key in ('TotalConfirmed', 'TotalDeaths'):
+        if key in row:
+          row[f'{key}Per100k'] = \
+            round(row[key] / row['Population'] * 1e5, 1) if row['Population'] else ''
+      rows.append(row)
+    rows.sort(key=lambda row: row[rankBy], reverse=True)
+    for rank, row in enumerate(rows, 1):
+      row['Rank'] = rank
+    result[level] = rows
+  return result
+
+def printAggregates(aggregates, file=None):
+  from helper import printTable
+
+  for level, rows in aggregates.items():
+    if not rows:
+      continue
+    fixed = ['Rank', level.capitalize(), 'Countries', 'Population']
+    keys = fixed + [key for key in rows[0] if key not in fixed]
+    print(file=file)
+    printTable(keys, rows, file=file)
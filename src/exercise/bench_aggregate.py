@@ -0,0 +1,22 @@
+import sys
+import time
+
+from aggregate import aggregateCountries
+from fakeserver import syntheticCountry, syntheticCountryData
+
+def main(maxExponent=6, numCodes=250):
+  countries = [syntheticCountry(i) for i in range(numCodes)]
+  metadata = {country['CountryCode']: syntheticCountryData(country['CountryCode'])
+              for country in countries}
+  print(f"{'rows':>9} | {'time':>9} | {'per row':>8}")
+  for exponent in range(4, maxExponent + 1):
+    n = 10 ** exponent
+    rows = [countries[i % numCodes] for i in range(n)]
+    start = time.perf_counter()
+    aggregateCountries(rows, metadata)
+    elapsed = time.perf_counter() - start
+    print(f'{n:>9} | {elapsed * 1e3:>7.1f}ms | {elapsed / n * 1e9:>6.0f}ns')
+
+
+if __name__ == '__main__':
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 6)
@@ -0,0 +1,39 @@
+import argparse
+import time
+
+import main
+from client import CovidClient
+from enrich import enrichCountries
+from fakeserver import FakeApiServer
+from lrucache import LRUCache
+
+def perCountry(countries, maxWorkers):
+  for _ in enrichCountries(countries, main.getCountryData, maxWorkers):
+    pass
+
+def batched(countries, maxWorkers):
+  main.getCountriesData([country['CountryCode'] for country in countries], maxWorkers=maxWorkers)
+
+def run(args):
+  with FakeApiServer(numCountries=args.countries, latency=args.latency,
+                     jitter=args.jitter) as server:
+    main.client = CovidClient(countriesApi=server.url, covidApi=server.url, poolSize=args.workers)
+    countries = server.summary['Countries']
+    for name, enrich in [('per country', perCountry), ('batched', batched)]:
+      main.countryCache = LRUCache(maxSize=2 * args.countries)
+      server.requests.clear()
+      start = time.perf_counter()
+      enrich(countries, args.workers)
+      elapsed = time.perf_counter() - start
+      print(f'{name:>12}: {server.requests.get("/alpha", 0):>4} requests, {elapsed * 1e3:8.1f} ms '
+            f'for {len(countries)} countries')
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(
+    description='Compare per-country and batched metadata enrichment.')
+  parser.add_argument('--countries', type=int, default=190)
+  parser.add_argument('--workers', type=int, default=4)
+  parser.add_argument('--latency', type=float, default=0.02)
+  parser.add_argument('--jitter', type=float, default=0.005)
+  run(parser.parse_args())
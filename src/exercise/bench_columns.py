@@ -0,0 +1,36 @@
+import gc
+import json
+import sys
+import tracemalloc
+
+from columns import CountryTable
+from fakeserver import syntheticSummary
+from main import sortCountries
+
+def tracedSize(build):
+  gc.collect()
+  tracemalloc.start()
+  result = build()
+  gc.collect()
+  size = tracemalloc.get_traced_memory()[0]
+  tracemalloc.stop()
+  return size, result
+
+def main(numRows=10000):
+  payload = json.dumps(syntheticSummary(numRows)['Countries'])
+  dictSize, rows = tracedSize(lambda: json.loads(payload))
+  tableSize, table = tracedSize(lambda: CountryTable.fromRows(json.loads(payload)))
+
+  sortBy = ['TotalConfirmed', 'NewConfirmed']
+  expected = [row['Country'] for row in sortCountries(rows, sortBy)]
+  assert [row['Country'] for row in sortCountries(table, sortBy)] == expected
+
+  perRows = 10000 / numRows
+  print(f'list of dicts: {dictSize * perRows / 1024:>9.1f} KiB per 10k rows')
+  print(f'CountryTable:  {tableSize * perRows / 1024:>9.1f} KiB per 10k rows '
+        f'({(dictSize - tableSize) * perRows / 1024:.1f} KiB saved, '
+        f'{dictSize / tableSize:.1f}x smaller)')
+
+
+if __name__ == '__main__':
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,35 @@
+import sys
+import time
+
+from columns import CountryTable
+from fakeserver import syntheticCountry
+from filterexpr import compileFilter
+
+EXPRESSION = 'NewConfirmed > 500 and TotalDeaths < 5000'
+
+def timeIt(fn):
+  start = time.perf_counter()
+  result = fn()
+  return time.perf_counter() - start, result
+
+def main(numRows=10 ** 6):
+  rows = [syntheticCountry(i) for i in range(numRows)]
+  table = CountryTable.fromRows(rows)
+  rowFilter = compileFilter(EXPRESSION)
+
+  results = {
+    'hand-written lambda': timeIt(lambda: list(filter(
+      lambda r: r['NewConfirmed'] > 500 and r['TotalDeaths'] < 5000, rows))),
+    'compiled, dict rows': timeIt(lambda: list(rowFilter.apply(rows))),
+    'compiled, columnar': timeIt(lambda: rowFilter.select(table)),
+    'compile only': timeIt(lambda: compileFilter(EXPRESSION)),
+  }
+  matches = len(results['hand-written lambda'][1])
+  assert len(results['compiled, dict rows'][1]) == len(results['compiled, columnar'][1]) == matches
+  print(f'{EXPRESSION!r} over {numRows} rows, {matches} matches')
+  for name, (elapsed, _) in results.items():
+    print(f'{name:>20}: {elapsed * 1e3:8.2f} ms')
+
+
+if __name__ == '__main__':
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6)
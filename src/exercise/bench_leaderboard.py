@@ -0,0 +1,48 @@
+import random
+import sys
+import time
+
+from leaderboard import Leaderboards
+from main import sortCountries
+
+SORT_BY = ['TotalConfirmed', 'NewConfirmed']
+
+def syntheticRows(n, seed=0):
+  rng = random.Random(seed)
+  return [{'Country': f'Country {i}', 'CountryCode': f'C{i}', 'NewConfirmed': rng.randrange(1000),
+           'TotalConfirmed': rng.randrange(n)} for i in range(n)]
+
+def changeRows(rows, fraction, seed=1):
+  # Copies rows with fraction of them given new counts, as a later fetch would.
+  rng = random.Random(seed)
+  rows = list(rows)
+  for i in rng.sample(range(len(rows)), int(len(rows) * fraction)):
+    row = rows[i] = dict(rows[i])
+    row['NewConfirmed'] = rng.randrange(1000)
+    row['TotalConfirmed'] += row['NewConfirmed']
+  return rows
+
+def timeIt(fn):
+  start = time.perf_counter()
+  result = fn()
+  return time.perf_counter() - start, result
+
+def main(maxExponent=6):
+  print(f"{'rows':>9} | {'changed':>7} | {'re-sort':>10} | {'leaderboard':>11} | {'speedup':>7}")
+  for exponent in range(4, maxExponent + 1):
+    rows = syntheticRows(10 ** exponent)
+    boards = Leaderboards()
+    boards.update(rows)
+    boards.view(SORT_BY)
+    for fraction in (0.01, 0.1, 1.0):
+      changed = changeRows(rows, fraction)
+      resort, expected = timeIt(lambda: sortCountries(changed, SORT_BY))
+      update, _ = timeIt(lambda: boards.update(changed))
+      assert boards.view(SORT_BY) == expected
+      boards.update(rows)
+      print(f'{len(rows):>9} | {fraction:>7.0%} | {resort * 1e3:>8.1f}ms | '
+            f'{update * 1e3:>9.1f}ms | {resort / update:>6.1f}x')
+
+
+if __name__ == '__main__':
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 6)
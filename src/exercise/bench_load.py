@@ -0,0 +1,67 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import main
+from client import CovidClient
+from fakeserver import FakeApiServer
+from lrucache import LRUCache
+
+def percentile(sortedValues, p):
+  if not sortedValues:
+    return float('nan')
+  return sortedValues[min(len(sortedValues) - 1, int(p / 100 * len(sortedValues)))]
+
+def runLoad(call, numRequests, concurrency):
+  latencies, errors = [], 0
+
+  def timedCall(i):
+    start = time.perf_counter()
+    try:
+      call(i)
+      return time.perf_counter() - start, None
+    except Exception as error:
+      return time.perf_counter() - start, error
+
+  start = time.perf_counter()
+  with ThreadPoolExecutor(max_workers=concurrency) as pool:
+    for latency, error in pool.map(timedCall, range(numRequests)):
+      latencies.append(latency)
+      errors += error is not None
+  return time.perf_counter() - start, sorted(latencies), errors
+
+def report(name, elapsed, latencies, errors):
+  ms = [percentile(latencies, p) * 1e3 for p in (50, 95, 99)]
+  print(f'{name:>14} | {len(latencies) / elapsed:>8.1f} req/s | p50 {ms[0]:>7.2f}ms | '
+        f'p95 {ms[1]:>7.2f}ms | p99 {ms[2]:>7.2f}ms | {errors} errors')
+
+def run(args):
+  with FakeApiServer(numCountries=args.countries, latency=args.latency, jitter=args.jitter,
+                     errorRate=args.error_rate) as server:
+    main.client = CovidClient(countriesApi=server.url, covidApi=server.url,
+                              poolSize=args.concurrency)
+    # Disable the in-process cache so every call reaches the server.
+    main.countryCache = LRUCache(maxSize=0)
+    main.summaryCache = None
+    codes = [country['CountryCode'] for country in server.summary['Countries']]
+
+    paths = {
+      'getCountryData': lambda i: main.getCountryData(codes[i % len(codes)]),
+      'summary': lambda i: main.getCovidGlobalSummary(),
+      'summary stream': lambda i: sum(1 for _ in main.getCovidGlobalSummary(stream=True)),
+    }
+    for name, call in paths.items():
+      report(name, *runLoad(call, args.requests, args.concurrency))
+    print(f'server saw {server.requests}')
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(
+    description='Measure client throughput and latency against the fake API server.')
+  parser.add_argument('--requests', type=int, default=500)
+  parser.add_argument('--concurrency', type=int, default=8)
+  parser.add_argument('--countries', type=int, default=190)
+  parser.add_argument('--latency', type=float, default=0.005)
+  parser.add_argument('--jitter', type=float, default=0.005)
+  parser.add_argument('--error-rate', type=float, default=0)
+  run(parser.parse_args())
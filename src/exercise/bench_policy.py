@@ -0,0 +1,39 @@
+import argparse
+
+import main
+from bench_load import report, runLoad
+from client import CovidClient
+from fakeserver import FakeApiServer
+from lrucache import LRUCache
+from policy import RequestPolicy
+
+def run(args):
+  policies = {
+    'no policy': None,
+    'retry': RequestPolicy(retries=3),
+    'retry + hedge': RequestPolicy(retries=3, hedge=True, maxWorkers=2 * args.concurrency),
+  }
+  for name, policy in policies.items():
+    # A fresh server per policy so each run sees the same injected latencies and failures.
+    with FakeApiServer(latency=args.latency, jitter=args.jitter, stallRate=args.stall_rate,
+                       stall=args.stall, errorRate=args.error_rate) as server:
+      main.client = CovidClient(countriesApi=server.url, covidApi=server.url,
+                                poolSize=2 * args.concurrency, policy=policy)
+      main.countryCache = LRUCache(maxSize=0)
+      report(name, *runLoad(lambda i: main.getCountryData('DE'), args.requests, args.concurrency))
+      if policy:
+        print(f'{"":>14} | {policy.stats}')
+      main.client.close()
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(
+    description='Compare tail latency with and without the request policy.')
+  parser.add_argument('--requests', type=int, default=1000)
+  parser.add_argument('--concurrency', type=int, default=8)
+  parser.add_argument('--latency', type=float, default=0.002)
+  parser.add_argument('--jitter', type=float, default=0.01)
+  parser.add_argument('--stall-rate', type=float, default=0.03)
+  parser.add_argument('--stall', type=float, default=0.2)
+  parser.add_argument('--error-rate', type=float, default=0.02)
+  run(parser.parse_args())
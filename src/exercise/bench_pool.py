@@ -0,0 +1,29 @@
+import sys
+import time
+
+import requests
+
+from client import CovidClient
+from fakeserver import FakeApiServer
+
+def timeRequests(fetch, url, n):
+  start = time.perf_counter()
+  for _ in range(n):
+    res = fetch(url)
+    res.raise_for_status()
+    res.json()
+  return (time.perf_counter() - start) / n
+
+def main(n=500):
+  with FakeApiServer() as server, \
+       CovidClient(countriesApi=server.url, covidApi=server.url) as client:
+    for name, path in [('country', '/alpha/de'), ('summary', '/summary')]:
+      url = server.url + path
+      unpooled = timeRequests(requests.get, url, n)
+      pooled = timeRequests(client.session.get, url, n)
+      print(f'{name:>8}: unpooled {unpooled * 1e3:.3f} ms/req, pooled {pooled * 1e3:.3f} ms/req '
+            f'({unpooled / pooled:.2f}x)')
+
+
+if __name__ == '__main__':
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
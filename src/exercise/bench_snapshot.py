@@ -0,0 +1,60 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+from fakeserver import syntheticSummary
+from helper import printTable
+from main import sortCountries
+from snapshot import SnapshotTable, writeSnapshot
+
+SORT_BY = ['TotalConfirmed', 'NewConfirmed']
+KEYS = ['Country', 'NewConfirmed', 'TotalConfirmed', 'NewDeaths', 'TotalDeaths']
+
+def report(countries, top):
+  with contextlib.redirect_stdout(io.StringIO()):
+    printTable(KEYS, sortCountries(countries, SORT_BY, top))
+
+def fromJSON(path, top):
+  with open(path, 'rb') as f:
+    summary = json.load(f)
+  report(summary['Countries'], top)
+
+def fromSnapshot(path, top):
+  table = SnapshotTable(path)
+  report(table, top)
+  table.close()
+
+def timeIt(fn, *args, repeat=3):
+  best = float('inf')
+  for _ in range(repeat):
+    start = time.perf_counter()
+    fn(*args)
+    best = min(best, time.perf_counter() - start)
+  return best
+
+def main(numRows=100000):
+  summary = syntheticSummary(numRows)
+  with tempfile.TemporaryDirectory() as directory:
+    jsonPath = os.path.join(directory, 'summary.json')
+    snapshotPath = os.path.join(directory, 'summary.snap')
+    with open(jsonPath, 'w') as f:
+      json.dump(summary, f)
+    writeSnapshot(snapshotPath, summary['Global'], summary['Countries'])
+    print(f'{numRows} rows: JSON {os.path.getsize(jsonPath) / 2 ** 20:.1f} MiB, '
+          f'snapshot {os.path.getsize(snapshotPath) / 2 ** 20:.1f} MiB')
+
+    for label, top in [('full report', None), ('top 20', 20)]:
+      cold = timeIt(fromJSON, jsonPath, top)
+      warm = timeIt(fromSnapshot, snapshotPath, top)
+      print(f'{label:>12}: cold JSON {cold * 1e3:8.1f} ms, '
+            f'mmap snapshot {warm * 1e3:8.1f} ms ({cold / warm:.1f}x)')
+    openOnly = timeIt(lambda: SnapshotTable(snapshotPath).close())
+    print(f'{"open only":>12}: mmap snapshot {openOnly * 1e3:8.3f} ms')
+
+
+if __name__ == '__main__':
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,38 @@
+import random
+import sys
+import time
+
+from main import sortCountries
+
+SORT_BY = ['TotalConfirmed', 'NewConfirmed']
+
+def syntheticRows(n, seed=0):
+  rng = random.Random(seed)
+  return [{'Country': f'Country {i}', 'NewConfirmed': rng.randrange(1000),
+           'TotalConfirmed': rng.randrange(n), 'NewDeaths': rng.randrange(50),
+           'TotalDeaths': rng.randrange(20000)} for i in range(n)]
+
+def multiPassSort(countries, sortBy):
+  for sortKey in reversed(sortBy):
+    countries = sorted(countries, key=lambda x: x[sortKey], reverse=True)
+  return countries
+
+def timeIt(fn):
+  start = time.perf_counter()
+  result = fn()
+  return time.perf_counter() - start, result
+
+def main(maxExponent=6, top=20):
+  print(f"{'rows':>9} | {'multi-pass':>10} | {'composite':>10} | {f'top {top}':>10}")
+  for exponent in range(3, maxExponent + 1):
+    rows = syntheticRows(10 ** exponent)
+    multiPass, expected = timeIt(lambda: multiPassSort(rows, SORT_BY))
+    composite, result = timeIt(lambda: sortCountries(rows, SORT_BY))
+    topN, topResult = timeIt(lambda: sortCountries(rows, SORT_BY, top))
+    assert result == expected and topResult == expected[:top]
+    print(f'{len(rows):>9} | {multiPass * 1e3:>8.1f}ms | {composite * 1e3:>8.1f}ms | '
+          f'{topN * 1e3:>8.1f}ms')
+
+
+if __name__ == '__main__':
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 6)
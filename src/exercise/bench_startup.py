@@ -0,0 +1,51 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def importTimes(module):
+  # Returns {name: (self us, cumulative us)} for module and everything it
+  # imported, as reported by -X importtime. Children are listed before their
+  # parent, so entries since the previous top-level import belong to module;
+  # that leaves out what site imported before the interpreter ran our code.
+  result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=HERE, capture_output=True, text=True, check=True)
+  times = {}
+  for line in result.stderr.splitlines():
+    if not line.startswith('import time:') or 'self [us]' in line:
+      continue
+    selfTime, cumulative, name = line[len('import time:'):].split('|')
+    times[name.strip()] = (int(selfTime), int(cumulative))
+    if not name[1:].startswith(' '):
+      if name.strip() == module:
+        return times
+      times = {}
+  raise RuntimeError(f'-X importtime did not report {module}')
+
+def main(module, budgetMs, runs, show):
+  samples = [importTimes(module) for _ in range(runs)]
+  cumulative = statistics.median(times[module][1] for times in samples) / 1e3
+  heaviest = sorted(samples[-1].items(), key=lambda item: item[1][1], reverse=True)[1:show + 1]
+
+  print(f'import {module}: {cumulative:.1f} ms (median of {runs}), budget {budgetMs:.1f} ms')
+  for name, (selfTime, total) in heaviest:
+    print(f'  {total / 1e3:7.2f} ms  {name.strip()}')
+  for heavy in ('requests', 'urllib3', 'concurrent.futures', 'sqlite3'):
+    if heavy in samples[-1]:
+      print(f'  warning: {heavy} is imported at startup')
+  return cumulative <= budgetMs
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(
+    description='Fail when importing the exercise CLI exceeds a time budget.')
+  parser.add_argument('--module', default='main')
+  parser.add_argument('--budget', type=float, default=25,
+                      help='allowed cumulative import time in ms')
+  parser.add_argument('--runs', type=int, default=5)
+  parser.add_argument('--show', type=int, default=8, help='number of heaviest imports to list')
+  args = parser.parse_args()
+  sys.exit(0 if main(args.module, args.budget, args.runs, args.show) else 1)
@@ -0,0 +1,51 @@
+import io
+import os
+import sys
+import time
+
+from bench_sort import syntheticRows
+from helper import printTable
+
+KEYS = ['Country', 'NewConfirmed', 'TotalConfirmed', 'NewDeaths', 'TotalDeaths']
+
+def printTableByRow(keys, rows, file=None):
+  # printTable before it stringified each cell once: str() twice per cell and
+  # one print() per row.
+  table = [[key] + [str(row[key]) for row in rows] for key in keys]
+  columnWidths = [max(len(row) for row in column) for column in table]
+  numColumns = len(keys)
+  lineLength = sum(columnWidths) + 3 * numColumns
+
+  print(*[k.rjust(columnWidths[i]) for i, k in enumerate(keys)], sep=' | ', file=file)
+  print(lineLength * '=', file=file)
+
+  for row in rows:
+    values = [str(row[k]) for k in keys]
+    print(*[v.rjust(columnWidths[i]) for i, v in enumerate(values)], sep=' | ', file=file)
+
+def timeIt(fn, rows, file):
+  start = time.perf_counter()
+  fn(KEYS, rows, file=file)
+  return time.perf_counter() - start
+
+def main(maxExponent=6):
+  for exponent in range(3, maxExponent + 1):
+    rows = syntheticRows(10 ** exponent)
+    old, new = io.StringIO(), io.StringIO()
+    printTableByRow(KEYS, rows, file=old)
+    printTable(KEYS, rows, file=new)
+    assert old.getvalue() == new.getvalue()
+
+  print(f"{'rows':>9} | {'sink':>7} | {'by row':>12} | {'buffered':>12} | {'speedup':>7}")
+  with open(os.devnull, 'w') as devnull:
+    for exponent in range(3, maxExponent + 1):
+      rows = syntheticRows(10 ** exponent)
+      for name, sink in (('memory', io.StringIO), ('devnull', lambda: devnull)):
+        old = timeIt(printTableByRow, rows, sink())
+        new = timeIt(printTable, rows, sink())
+        print(f'{len(rows):>9} | {name:>7} | {len(rows) / old:>8.0f} r/s | '
+              f'{len(rows) / new:>8.0f} r/s | {old / new:>6.1f}x')
+
+
+if __name__ == '__main__':
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 6)
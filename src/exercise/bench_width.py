@@ -0,0 +1,68 @@
+import io
+import random
+import sys
+import time
+
+import textwidth
+from bench_sort import syntheticRows
+from helper import printTable
+from textwidth import displayWidth
+
+KEYS = ['Country', 'NewConfirmed', 'TotalConfirmed', 'NewDeaths', 'TotalDeaths']
+NAMES = ['Côte d’Ivoire', 'Curaçao', 'Réunion', 'São Tomé and Príncipe', 'Türkiye', 'Åland Islands',
+         'Saint Barthélemy', 'Viet Nam (Việt Nam)', 'Korea (대한민국)', 'Japan (日本)', 'China (中国)',
+         'Cote d’Ivoire (decomposed: Côte)']
+
+def printTableByLen(keys, rows, file=None, linesPerWrite=4096):
+  # printTable before display widths: len() and rjust() for every column.
+  from helper import writeLines
+
+  columns = [[str(row[key]) for row in rows] for key in keys]
+  columnWidths = [max(len(key), max(map(len, column), default=0))
+                  for key, column in zip(keys, columns)]
+  padded = [[cell.rjust(width) for cell in column] for column, width in zip(columns, columnWidths)]
+  file.write(' | '.join(map(str.rjust, keys, columnWidths)) + '\n' +
+             (sum(columnWidths) + 3 * len(keys)) * '=' + '\n')
+  writeLines(file, map(' | '.join, zip(*padded)), linesPerWrite)
+
+def unicodeRows(n, seed=0):
+  # syntheticRows with a tenth of the countries given non-ASCII names, and
+  # every name distinct as in a real summary.
+  rng = random.Random(seed)
+  rows = syntheticRows(n, seed)
+  for i, row in enumerate(rows):
+    if rng.random() < 0.1:
+      row['Country'] = f'{rng.choice(NAMES)} {i}'
+  return rows
+
+def timeIt(fn, rows, repeat=5):
+  best = float('inf')
+  for _ in range(repeat):
+    textwidth.cache.clear()
+    start = time.perf_counter()
+    fn(KEYS, rows, file=io.StringIO())
+    best = min(best, time.perf_counter() - start)
+  return best
+
+def main(maxExponent=6):
+  start = time.perf_counter()
+  textwidth.table = textwidth.buildTable()
+  print(f'width table built in {(time.perf_counter() - start) * 1e3:.1f} ms')
+
+  out = io.StringIO()
+  printTable(KEYS, unicodeRows(1000), file=out)
+  header, _, *lines = out.getvalue().splitlines()
+  assert {displayWidth(line) for line in lines} == {displayWidth(header)}, 'columns are misaligned'
+
+  print(f"{'rows':>9} | {'names':>7} | {'len()':>10} | {'display':>10} | {'overhead':>8}")
+  for exponent in range(3, maxExponent + 1):
+    for name, rows in (('ascii', syntheticRows(10 ** exponent)),
+                       ('unicode', unicodeRows(10 ** exponent))):
+      byLen = timeIt(printTableByLen, rows)
+      byWidth = timeIt(printTable, rows)
+      print(f'{len(rows):>9} | {name:>7} | {byLen * 1e3:>8.1f}ms | {byWidth * 1e3:>8.1f}ms | '
+            f'{byWidth / byLen:>7.2f}x')
+
+
+if __name__ == '__main__':
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 6)
@@ -0,0 +1,121 @@
+from profiling import profiler
+from ratelimit import retryAfterSeconds
+
+COUNTRIES_API = 'https://restcountries.eu/rest/v2'
+COVID_API = 'https://api.covid19api.com'
+
+class CovidClient:
+  def __init__(self, countriesApi=COUNTRIES_API, covidApi=COVID_API,
+               poolSize=10, connectTimeout=3.05, readTimeout=30, policy=None, limiter=None):
+    self.countriesApi = countriesApi.rstrip('/')
+    self.covidApi = covidApi.rstrip('/')
+    self.timeout = (connectTimeout, readTimeout)
+    self.policy = policy
+    self.limiter = limiter
+    self.poolSize = poolSize
+    self.openSession = None
+
+  @property
+  def session(self):
+    # requests is only imported once the first request is made, which keeps
+    # it off the startup path when the report comes from a local snapshot.
+    if self.openSession is None:
+      import requests
+      from requests.adapters import HTTPAdapter
+
+      # One adapter per scheme keeps up to poolSize idle keep-alive
+      # connections per host, so repeated calls skip the TCP/TLS handshake.
+      adapter = HTTPAdapter(pool_connections=self.poolSize, pool_maxsize=self.poolSize)
+      self.openSession = requests.Session()
+      self.openSession.mount('http://', adapter)
+      self.openSession.mount('https://', adapter)
+    return self.openSession
+
+  def send(self, url, timeout=None, **kwargs):
+    # Every attempt, retries and hedges included, takes a token from the
+    # limiter, and a Retry-After on 429/503 pauses that host's bucket.
+    def send():
+      if self.limiter is not None:
+        self.limiter.acquire(url)
+      res = self.session.get(url, timeout=timeout or self.timeout, **kwargs)
+      if self.limiter is not None and res.status_code in (429, 503):
+        retryAfter = retryAfterSeconds(res.headers.get('Retry-After'))
+        if retryAfter:
+          self.limiter.pause(url, retryAfter)
+      return res
+
+    return self.policy.execute(send, url) if self.policy else send()
+
+  def get(self, url, timeout=None, **kwargs):
+    res = self.send(url, timeout, **kwargs)
+    res.raise_for_status()
+    return res
+
+  def getJSON(self, url, timeout=None, cache=None):
+    if cache is None:
+      with profiler.span('fetch'):
+        res = self.get(url, timeout=timeout)
+        res.content
+      with profiler.span('decode'):
+        return res.json()
+
+    meta = cache.load(url)
+    if meta and cache.isFresh(meta):
+      cache.stats['hits'] += 1
+      with profiler.span('decode'):
+        return cache.readJSON(meta)
+
+    headers = cache.conditionalHeaders(meta) if meta else {}
+    with profiler.span('fetch'):
+      res = self.send(url, timeout, headers=headers)
+      res.content
+    if meta and res.status_code == 304:
+      cache.stats['revalidations'] += 1
+      with profiler.span('decode'):
+        return cache.readJSON(cache.refresh(meta))
+
+    res.raise_for_status()
+    cache.stats['misses'] += 1
+    meta = cache.store(url, res.content, res.headers)
+    with profiler.span('decode'):
+      data = res.json()
+    cache.parsed[(url, meta['etag'], meta['lastModified'])] = data
+    return data
+
+  def iterContent(self, url, timeout=None, cache=None, chunkSize=64 * 1024):
+    meta = cache.load(url) if cache else None
+    if meta and cache.isFresh(meta):
+      cache.stats['hits'] += 1
+      yield from profiler.iterate('fetch', cache.iterBody(meta, chunkSize))
+      return
+
+    headers = cache.conditionalHeaders(meta) if meta else {}
+    # Connecting and waiting for the response headers happen here, inside
+    # whatever span is consuming the body, so charge them to fetch too.
+    with profiler.span('fetch'):
+      res = self.send(url, timeout, headers=headers, stream=True)
+    with res:
+      if meta and res.status_code == 304:
+        cache.stats['revalidations'] += 1
+        yield from profiler.iterate('fetch', cache.iterBody(cache.refresh(meta), chunkSize))
+        return
+
+      res.raise_for_status()
+      chunks = res.iter_content(chunkSize)
+      if cache:
+        cache.stats['misses'] += 1
+        chunks = cache.storeStream(url, chunks, res.headers)
+      yield from profiler.iterate('fetch', chunks)
+
+  def close(self):
+    if self.openSession is not None:
+      self.openSession.close()
+      self.openSession = None
+    if self.policy:
+      self.policy.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    self.close()
@@ -0,0 +1,96 @@
+import heapq
+from array import array
+
+NUMERIC_KEYS = ['NewConfirmed', 'TotalConfirmed', 'NewDeaths', 'TotalDeaths', 'NewRecovered',
+                'TotalRecovered']
+STRING_KEYS = ['Country', 'CountryCode', 'Slug', 'Date']
+
+class Row:
+  __slots__ = ('table', 'index')
+
+  def __init__(self, table, index):
+    self.table = table
+    self.index = index
+
+  def __getitem__(self, key):
+    return self.table.value(key, self.index)
+
+  def keys(self):
+    return self.table.keys
+
+  def asDict(self):
+    return {key: self[key] for key in self.table.keys}
+
+  def __repr__(self):
+    return f'Row({self.asDict()!r})'
+
+class ColumnTable:
+  # Shared row access for column stores; subclasses provide keys, length,
+  # value(key, index) and column(key).
+  def __len__(self):
+    return self.length
+
+  def __getitem__(self, index):
+    if not -self.length <= index < self.length:
+      raise IndexError(f'{type(self).__name__} index out of range')
+    return Row(self, index % self.length)
+
+  def __iter__(self):
+    return (Row(self, index) for index in range(self.length))
+
+  def sortedRows(self, sortBy, top=None):
+    # Sorts row indices on keys zipped from whole columns, which skips the
+    # per-row Row lookups of sorting the row views themselves.
+    keys = list(zip(*(self.column(key) for key in sortBy)))
+    if top is None:
+      indices = sorted(range(self.length), key=keys.__getitem__, reverse=True)
+    else:
+      indices = heapq.nlargest(top, range(self.length), key=keys.__getitem__)
+    return [Row(self, index) for index in indices]
+
+class CountryTable(ColumnTable):
+  # Column-oriented storage for summary rows: one int64 array per numeric key,
+  # and string columns as uint32 indices into a shared table of distinct
+  # strings, so repeated values such as Date are stored once.
+  def __init__(self, numericKeys=NUMERIC_KEYS, stringKeys=STRING_KEYS):
+    self.keys = list(stringKeys) + list(numericKeys)
+    self.numeric = {key: array('q') for key in numericKeys}
+    self.codes = {key: array('I') for key in stringKeys}
+    self.strings = []
+    self.stringIndex = {}
+    self.length = 0
+
+  @classmethod
+  def fromRows(cls, rows, **kwargs):
+    table = cls(**kwargs)
+    table.extend(rows)
+    return table
+
+  def intern(self, string):
+    code = self.stringIndex.get(string)
+    if code is None:
+      code = self.stringIndex[string] = len(self.strings)
+      self.strings.append(string)
+    return code
+
+  def append(self, row):
+    for key, column in self.numeric.items():
+      column.append(row.get(key, 0))
+    for key, column in self.codes.items():
+      column.append(self.intern(row.get(key, '')))
+    self.length += 1
+
+  def extend(self, rows):
+    for row in rows:
+      self.append(row)
+
+  def value(self, key, index):
+    column = self.numeric.get(key)
+    if column is not None:
+      return column[index]
+    return self.strings[self.codes[key][index]]
+
+  def column(self, key):
+    if key in self.numeric:
+      return self.numeric[key]
+    return [self.strings[code] for code in self.codes[key]]
@@ -0,0 +1,194 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from urllib.parse import parse_qs, urlparse
+
+import main
+from leaderboard import Leaderboards
+
+class SingleFlight:
+  # Runs fn for the first caller and makes everyone who arrives while it is
+  # running wait for and share that result instead of calling fn again.
+  def __init__(self):
+    self.lock = threading.Lock()
+    self.flight = None
+
+  def do(self, fn):
+    with self.lock:
+      flight, leader = self.flight, self.flight is None
+      if leader:
+        flight = self.flight = {'done': threading.Event(), 'result': None, 'error': None}
+    if leader:
+      try:
+        flight['result'] = fn()
+      except Exception as error:
+        flight['error'] = error
+      finally:
+        with self.lock:
+          self.flight = None
+        flight['done'].set()
+    else:
+      flight['done'].wait()
+    if flight['error'] is not None:
+      raise flight['error']
+    return flight['result'], leader
+
+class SummaryService:
+  # Keeps the latest summary in memory. Within maxAge seconds it is served
+  # as is; for staleFor seconds after that it is still served while one
+  # background refresh runs; older than that, callers wait for a refresh.
+  # Every refresh goes through one SingleFlight, so concurrent callers and
+  # the scheduler cause a single upstream call. Sorted views are served from
+  # leaderboards that each refresh only updates for the countries that changed.
+  def __init__(self, fetch=main.getCovidGlobalSummary, maxAge=300, staleFor=3600,
+               clock=time.monotonic):
+    self.fetch = fetch
+    self.maxAge = maxAge
+    self.staleFor = staleFor
+    self.clock = clock
+    self.singleFlight = SingleFlight()
+    self.state = None
+    self.leaderboards = Leaderboards()
+    self.stats = {'requests': 0, 'upstreamCalls': 0, 'coalesced': 0, 'staleServed': 0,
+                  'refreshErrors': 0}
+    self.statsLock = threading.Lock()
+
+  def count(self, stat):
+    # Handler threads, background refreshes and the scheduler all count.
+    with self.statsLock:
+      self.stats[stat] += 1
+
+  def snapshotStats(self):
+    with self.statsLock:
+      return dict(self.stats)
+
+  def refresh(self):
+    state, leader = self.singleFlight.do(self.load)
+    self.count('upstreamCalls' if leader else 'coalesced')
+    return state
+
+  def load(self):
+    summary = self.fetch()
+    self.leaderboards.update(summary['Countries'])
+    # The rendered views are built once per refresh, not once per request.
+    text = StringIO()
+    rows = self.leaderboards.view(['TotalConfirmed', 'NewConfirmed'])
+    main.printReport(summary['Global'], rows, file=text)
+    self.state = {'summary': summary, 'fetchedAt': self.clock(), 'table': text.getvalue().encode(),
+                  'json': json.dumps(summary).encode()}
+    return self.state
+
+  def refreshInBackground(self):
+    def run():
+      try:
+        self.refresh()
+      except Exception:
+        self.count('refreshErrors')
+    threading.Thread(target=run, daemon=True).start()
+
+  def get(self):
+    self.count('requests')
+    state = self.state
+    if state is None:
+      return self.refresh()
+    age = self.clock() - state['fetchedAt']
+    if age < self.maxAge:
+      return state
+    if age < self.maxAge + self.staleFor:
+      self.count('staleServed')
+      if self.singleFlight.flight is None:
+        self.refreshInBackground()
+      return state
+    return self.refresh()
+
+  def runScheduler(self, interval, stop):
+    while not stop.wait(interval):
+      try:
+        self.refresh()
+      except Exception:
+        self.count('refreshErrors')
+
+class ReportHandler(BaseHTTPRequestHandler):
+  protocol_version = 'HTTP/1.1'
+  disable_nagle_algorithm = True
+
+  def do_GET(self):
+    url = urlparse(self.path)
+    service = self.server.service
+    if url.path == '/stats':
+      return self.send(200, 'application/json', json.dumps(service.snapshotStats()).encode())
+    if url.path not in ('/', '/summary', '/summary.json'):
+      return self.send(404, 'text/plain', b'Not Found\n')
+
+    try:
+      state = service.get()
+    except Exception as error:
+      return self.send(502, 'text/plain', f'Upstream error: {error}\n'.encode())
+
+    if url.path == '/summary.json':
+      return self.send(200, 'application/json', state['json'])
+
+    query = parse_qs(url.query)
+    if 'top' in query or 'sortBy' in query:
+      sortBy = query.get('sortBy', ['TotalConfirmed,NewConfirmed'])[0].split(',')
+      top = query.get('top', [None])[0]
+      if top is not None:
+        if not (top.isascii() and top.isdigit()):
+          message = f'top must be a non-negative integer, got {top!r}\n'
+          return self.send(400, 'text/plain', message.encode())
+        top = int(top)
+      text = StringIO()
+      try:
+        rows = service.leaderboards.view(sortBy, top)
+        main.printReport(state['summary']['Global'], rows, file=text)
+      except KeyError as error:
+        return self.send(400, 'text/plain', f'Unknown sort key {error}\n'.encode())
+      except ValueError as error:
+        return self.send(400, 'text/plain', f'{error}\n'.encode())
+      return self.send(200, 'text/plain; charset=utf-8', text.getvalue().encode())
+    self.send(200, 'text/plain; charset=utf-8', state['table'])
+
+  def send(self, status, contentType, body):
+    self.send_response(status)
+    self.send_header('Content-Type', contentType)
+    self.send_header('Content-Length', str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def log_message(self, *args):
+    pass
+
+class ReportServer(ThreadingHTTPServer):
+  daemon_threads = True
+
+  def __init__(self, service, host='127.0.0.1', port=8080):
+    super().__init__((host, port), ReportHandler)
+    self.service = service
+
+
+if __name__ == '__main__':
+  import argparse
+
+  parser = argparse.ArgumentParser(
+    description='Serve the global COVID-19 summary from memory over HTTP.')
+  parser.add_argument('--host', default='127.0.0.1')
+  parser.add_argument('--port', type=int, default=8080)
+  parser.add_argument('--refresh', type=float, default=300,
+                      help='seconds between scheduled refreshes')
+  parser.add_argument('--stale', type=float, default=3600,
+                      help='seconds a summary past its refresh interval may still be served '
+                           'while refreshing')
+  args = parser.parse_args()
+
+  service = SummaryService(maxAge=args.refresh, staleFor=args.stale)
+  service.refresh()
+  stop = threading.Event()
+  threading.Thread(target=service.runScheduler, args=(args.refresh, stop), daemon=True).start()
+  with ReportServer(service, args.host, args.port) as server:
+    print(f'Serving the summary on http://{args.host}:{server.server_address[1]}/summary')
+    try:
+      server.serve_forever()
+    except KeyboardInterrupt:
+      stop.set()
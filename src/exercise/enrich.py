@@ -0,0 +1,21 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+def fetchConcurrently(codes, fetch, maxWorkers=8, timeout=10):
+  # Yields (code, result, error) as each lookup finishes, so one slow or
+  # failing code neither blocks the others nor aborts the run.
+  with ThreadPoolExecutor(max_workers=maxWorkers) as pool:
+    futures = {pool.submit(fetch, code, timeout=timeout): code for code in codes}
+    for future in as_completed(futures):
+      try:
+        yield futures[future], future.result(), None
+      except Exception as error:
+        yield futures[future], None, error
+
+def enrichCountries(countries, fetch, maxWorkers=8, timeout=10):
+  byCode = {}
+  for country in countries:
+    byCode.setdefault(country['CountryCode'], []).append(country)
+
+  for code, data, error in fetchConcurrently(byCode, fetch, maxWorkers, timeout):
+    for country in byCode[code]:
+      yield country, data, error
@@ -0,0 +1,78 @@
+import csv
+import gzip
+import io
+import json
+import sys
+
+BUFFER_SIZE = 1 << 16
+
+class CSVSink:
+  def __init__(self, text, keys):
+    self.keys = keys
+    self.writer = csv.writer(text, lineterminator='\n')
+    self.writer.writerow(keys)
+
+  def write(self, row):
+    self.writer.writerow([row[key] for key in self.keys])
+
+class JSONLinesSink:
+  def __init__(self, text, keys):
+    self.keys = keys
+    self.text = text
+    self.encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+  def write(self, row):
+    self.text.write(self.encoder.encode({key: row[key] for key in self.keys}))
+    self.text.write('\n')
+
+
+SINKS = {'csv': CSVSink, 'jsonl': JSONLinesSink}
+
+def formatOf(path):
+  name = path[:-3] if path.endswith('.gz') else path
+  return 'jsonl' if name.endswith(('.jsonl', '.ndjson')) else 'csv'
+
+class Export:
+  # Writes rows one at a time through a large text buffer, optionally
+  # gzipped. Fixed column order, '\n' line endings and a zero gzip mtime
+  # make the output byte-identical for identical rows.
+  def __init__(self, path, keys, format=None, compress=None):
+    self.format = format or formatOf(path)
+    compress = path.endswith('.gz') if compress is None else compress
+    if path == '-':
+      self.raw, self.closeRaw = sys.stdout.buffer, False
+    else:
+      self.raw, self.closeRaw = open(path, 'wb', buffering=BUFFER_SIZE), True
+    self.compress = compress
+    binary = self.raw
+    if compress:
+      gzipFile = gzip.GzipFile(filename='', mode='wb', fileobj=self.raw, mtime=0)
+      binary = io.BufferedWriter(gzipFile, BUFFER_SIZE)
+    self.text = io.TextIOWrapper(binary, encoding='utf-8', newline='')
+    self.sink = SINKS[self.format](self.text, keys)
+    self.count = 0
+
+  def write(self, row):
+    self.sink.write(row)
+    self.count += 1
+
+  def writeAll(self, rows):
+    for row in rows:
+      self.write(row)
+    return self
+
+  def close(self):
+    # Detaching leaves self.raw open, which matters when it is stdout.
+    binary = self.text.detach()
+    if self.compress:
+      binary.close()
+    if self.closeRaw:
+      self.raw.close()
+    else:
+      self.raw.flush()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    self.close()
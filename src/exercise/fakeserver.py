@@ -0,0 +1,171 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def syntheticCountry(i, padding=0):
+  code = chr(65 + i // 26 % 26) + chr(65 + i % 26)
+  return {
+    'Premium': {'Padding': 'x' * padding} if padding else {},
+    'Country': f'Country {i}',
+    'CountryCode': code,
+    'Slug': f'country-{i}',
+    'NewConfirmed': i * 7 % 1000,
+    'TotalConfirmed': i * 7919 % 1000000,
+    'NewDeaths': i * 3 % 50,
+    'TotalDeaths': i * 104729 % 20000,
+    'NewRecovered': i * 5 % 800,
+    'TotalRecovered': i * 6007 % 900000,
+    'Date': '2020-06-01T00:00:00Z',
+  }
+
+def syntheticSummary(numCountries=190, padding=0):
+  countries = [syntheticCountry(i, padding) for i in range(numCountries)]
+  keys = ['NewConfirmed', 'TotalConfirmed', 'NewDeaths', 'TotalDeaths', 'NewRecovered',
+          'TotalRecovered']
+  return {
+    'Global': {k: sum(c[k] for c in countries) for k in keys},
+    'Countries': countries,
+    'Date': '2020-06-01T00:00:00Z',
+  }
+
+def syntheticCountryData(code):
+  return {'name': f'Country {code}', 'alpha2Code': code,
+          'population': 1000000 + sum(map(ord, code)) * 1000,
+          'region': 'Region ' + code[0], 'subregion': 'Subregion ' + code}
+
+class FakeApiHandler(BaseHTTPRequestHandler):
+  protocol_version = 'HTTP/1.1'
+  disable_nagle_algorithm = True
+
+  def do_GET(self):
+    server = self.server
+    path = self.path.split('?')[0]
+    server.count(path)
+    time.sleep(server.delay())
+    if server.failing():
+      headers = {'Retry-After': str(server.retryAfter)} if server.retryAfter else {}
+      body = json.dumps({'status': 503, 'message': 'Injected failure'}).encode()
+      self.sendBody(503, body, headers)
+    elif path == '/summary':
+      if self.headers.get('If-None-Match') == server.summaryETag:
+        self.sendBody(304, b'', {'ETag': server.summaryETag})
+      else:
+        self.sendBody(200, server.summaryBody, {'ETag': server.summaryETag})
+    elif path == '/alpha' and 'codes=' in self.path:
+      codes = self.path.split('codes=', 1)[1].split('&')[0].upper().split(';')
+      self.sendJSON(200, [syntheticCountryData(code) for code in codes
+                          if code not in server.unknownCodes])
+    elif path.startswith('/alpha/') and path[len('/alpha/'):].upper() not in server.unknownCodes:
+      self.sendJSON(200, syntheticCountryData(path[len('/alpha/'):].upper()))
+    else:
+      self.sendJSON(404, {'status': 404, 'message': 'Not Found'})
+
+  def sendJSON(self, status, obj):
+    self.sendBody(status, json.dumps(obj).encode())
+
+  def sendBody(self, status, body, headers={}):
+    self.send_response(status)
+    self.send_header('Content-Type', 'application/json')
+    self.send_header('Content-Length', str(len(body)))
+    for name, value in headers.items():
+      self.send_header(name, value)
+    self.end_headers()
+    self.wfile.write(body)
+
+  def log_message(self, *args):
+    pass
+
+class FakeApiServer(ThreadingHTTPServer):
+  # Stand-in for both upstream APIs. Every response waits latency seconds
+  # plus an exponentially distributed jitter with mean jitter seconds, stalls
+  # for another stall seconds with probability stallRate, and fails with 503
+  # with probability errorRate, asking clients to back off for retryAfter
+  # seconds if set. The summary is either a
+  # canned payload from summaryFile or numCountries synthetic rows padded
+  # with padding extra bytes each.
+  daemon_threads = True
+
+  def __init__(self, host='127.0.0.1', port=0, numCountries=190, padding=0, summaryFile=None,
+               latency=0, jitter=0, stallRate=0, stall=0.5, errorRate=0, retryAfter=0,
+               unknownCodes=('XX',), seed=0):
+    super().__init__((host, port), FakeApiHandler)
+    if summaryFile:
+      with open(summaryFile, 'rb') as f:
+        self.summaryBody = f.read()
+      self.summary = json.loads(self.summaryBody)
+    else:
+      self.summary = syntheticSummary(numCountries, padding)
+      self.summaryBody = json.dumps(self.summary).encode()
+    self.summaryETag = '"%s"' % hashlib.sha1(self.summaryBody).hexdigest()
+    self.latency = latency
+    self.jitter = jitter
+    self.stallRate = stallRate
+    self.stall = stall
+    self.errorRate = errorRate
+    self.retryAfter = retryAfter
+    self.unknownCodes = set(unknownCodes)
+    self.random = random.Random(seed)
+    self.lock = threading.Lock()
+    self.requests = {}
+
+  def count(self, path):
+    endpoint = path.rsplit('/', 1)[0] or path
+    with self.lock:
+      self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+  def delay(self):
+    with self.lock:
+      delay = self.latency + (self.random.expovariate(1 / self.jitter) if self.jitter else 0)
+      if self.stallRate > 0 and self.random.random() < self.stallRate:
+        delay += self.stall
+      return delay
+
+  def failing(self):
+    with self.lock:
+      return self.errorRate > 0 and self.random.random() < self.errorRate
+
+  @property
+  def url(self):
+    host, port = self.server_address[:2]
+    return f'http://{host}:{port}'
+
+  def __enter__(self):
+    threading.Thread(target=self.serve_forever, daemon=True).start()
+    return self
+
+  def __exit__(self, *exc):
+    self.shutdown()
+    self.server_close()
+
+
+if __name__ == '__main__':
+  import argparse
+
+  parser = argparse.ArgumentParser(
+    description='Serve a local stand-in for the COVID and restcountries APIs.')
+  parser.add_argument('--port', type=int, default=8000)
+  parser.add_argument('--countries', type=int, default=190,
+                      help='number of synthetic countries in the summary')
+  parser.add_argument('--padding', type=int, default=0, help='extra bytes per synthetic country')
+  parser.add_argument('--summary-file', help='serve this canned summary payload instead')
+  parser.add_argument('--latency', type=float, default=0, help='base response delay in seconds')
+  parser.add_argument('--jitter', type=float, default=0,
+                      help='mean of the extra exponential delay in seconds')
+  parser.add_argument('--stall-rate', type=float, default=0, help='fraction of requests that stall')
+  parser.add_argument('--stall', type=float, default=0.5,
+                      help='extra delay of a stalled request in seconds')
+  parser.add_argument('--error-rate', type=float, default=0,
+                      help='fraction of requests answered with 503')
+  parser.add_argument('--retry-after', type=float, default=0,
+                      help='Retry-After seconds sent with injected 503s')
+  args = parser.parse_args()
+
+  with FakeApiServer(port=args.port, numCountries=args.countries, padding=args.padding,
+                     summaryFile=args.summary_file, latency=args.latency, jitter=args.jitter,
+                     stallRate=args.stall_rate, stall=args.stall, errorRate=args.error_rate,
+                     retryAfter=args.retry_after) as server:
+    print(f'Serving fake COVID and restcountries API on {server.url}')
+    threading.Event().wait()
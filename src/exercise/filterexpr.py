@@ -0,0 +1,196 @@
+import re
+
+# A filter is a boolean expression over row fields, for example
+#   NewConfirmed > 1000 and TotalDeaths < 50000
+#   not (Country == 'Germany' or Country == "France")
+# with comparisons < <= > >= == != (= is accepted for ==), and/or/not,
+# parentheses, numbers and quoted strings. It is parsed once into a tuple
+# tree and turned into Python source that is compiled once. Ordering
+# comparisons on a nullable field are False where the field is None.
+TOKEN = re.compile(r'''\s*(?:
+  (?P<number>-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?) |
+  (?P<string>'[^']*'|"[^"]*") |
+  (?P<op><=|>=|==|!=|<|>|=) |
+  (?P<paren>[()]) |
+  (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+)''', re.VERBOSE)
+KEYWORDS = {'and', 'or', 'not'}
+OPERATORS = {'<': '<', '<=': '<=', '>': '>', '>=': '>=', '==': '==', '=': '==', '!=': '!='}
+ORDERING = {'<', '<=', '>', '>='}
+
+def tokenize(expression):
+  tokens, pos = [], 0
+  expression = expression.rstrip()
+  while pos < len(expression):
+    match = TOKEN.match(expression, pos)
+    if match is None:
+      raise ValueError(f'Unexpected character {expression[pos:].lstrip()[:1]!r} '
+                       f'at offset {pos} of filter')
+    kind = match.lastgroup
+    text, start = match.group(kind), match.start(kind)
+    if kind == 'name' and text in KEYWORDS:
+      kind = text
+    tokens.append((kind, text, start))
+    pos = match.end()
+  tokens.append(('end', '', pos))
+  return tokens
+
+class Parser:
+  def __init__(self, expression):
+    self.tokens = tokenize(expression)
+    self.pos = 0
+
+  def peek(self):
+    return self.tokens[self.pos][0]
+
+  def take(self, kind=None, text=None):
+    token = self.tokens[self.pos]
+    if kind is not None and (token[0] != kind or text is not None and token[1] != text):
+      expected = repr(text) if text is not None else kind.replace('end', 'end of input')
+      raise ValueError(f'Expected {expected} at offset {token[2]} of filter, '
+                       f'got {token[1] or "end of input"!r}')
+    self.pos += 1
+    return token
+
+  def parse(self):
+    tree = self.orExpr()
+    self.take('end')
+    return tree
+
+  def orExpr(self):
+    tree = self.andExpr()
+    while self.peek() == 'or':
+      self.take()
+      tree = ('or', tree, self.andExpr())
+    return tree
+
+  def andExpr(self):
+    tree = self.notExpr()
+    while self.peek() == 'and':
+      self.take()
+      tree = ('and', tree, self.notExpr())
+    return tree
+
+  def notExpr(self):
+    if self.peek() == 'not':
+      self.take()
+      return ('not', self.notExpr())
+    tree = self.operand()
+    if self.peek() == 'op':
+      op = OPERATORS[self.take()[1]]
+      tree = ('compare', op, tree, self.operand())
+    return tree
+
+  def operand(self):
+    kind, text, offset = self.take()
+    if kind == 'number':
+      return ('literal', float(text) if any(c in text for c in '.eE') else int(text))
+    if kind == 'string':
+      return ('literal', text[1:-1])
+    if kind == 'name':
+      return ('field', text)
+    if text == '(':
+      tree = self.orExpr()
+      self.take('paren', ')')
+      return tree
+    raise ValueError(f'Unexpected {text or "end of input"!r} at offset {offset} of filter')
+
+def fields(tree):
+  if tree[0] == 'field':
+    return [tree[1]]
+  if tree[0] == 'literal':
+    return []
+  return [name for child in tree[1:] if isinstance(child, tuple) for name in fields(child)]
+
+def kindOf(tree, fieldTypes):
+  # 'number' or 'text' for operands whose type is known, else None.
+  if tree[0] == 'literal':
+    return 'text' if isinstance(tree[1], str) else 'number'
+  if tree[0] == 'field' and tree[1] in fieldTypes:
+    return 'text' if fieldTypes[tree[1]] is str else 'number'
+  return None
+
+def checkTypes(tree, fieldTypes):
+  # Rejects comparisons between text and numbers, which Python cannot order
+  # and which would never be equal.
+  if tree[0] == 'compare':
+    left, right = kindOf(tree[2], fieldTypes), kindOf(tree[3], fieldTypes)
+    if left and right and left != right:
+      raise ValueError(f'Cannot compare {describe(tree[2])} ({left}) with '
+                       f'{describe(tree[3])} ({right}) in filter')
+  for child in tree[1:]:
+    if isinstance(child, tuple):
+      checkTypes(child, fieldTypes)
+
+def describe(tree):
+  return tree[1] if tree[0] == 'field' else repr(tree[1])
+
+def toSource(tree, fieldSource, nullable=()):
+  kind = tree[0]
+  if kind == 'literal':
+    return repr(tree[1])
+  if kind == 'field':
+    return fieldSource(tree[1])
+  if kind == 'not':
+    return f'(not {toSource(tree[1], fieldSource, nullable)})'
+  if kind == 'compare':
+    left, right = (toSource(child, fieldSource, nullable) for child in tree[2:])
+    guards = [f'{operand} is not None and '
+              for operand, child in ((left, tree[2]), (right, tree[3]))
+              if tree[1] in ORDERING and child[0] == 'field' and child[1] in nullable]
+    return f"({''.join(guards)}{left} {tree[1]} {right})"
+  left, right = (toSource(child, fieldSource, nullable) for child in tree[1:])
+  return f'({left} {kind} {right})'
+
+class Filter:
+  # allowedFields is a collection of field names, or a dict of field name to
+  # type (int, float or str) to also reject comparisons of text with numbers.
+  # nullableFields may be None in a row.
+  def __init__(self, expression, allowedFields=None, nullableFields=()):
+    self.expression = expression
+    self.tree = Parser(expression).parse()
+    self.fields = list(dict.fromkeys(fields(self.tree)))
+    unknown = [name for name in self.fields
+               if allowedFields is not None and name not in allowedFields]
+    if unknown:
+      raise ValueError(f"Unknown field {unknown[0]!r} in filter, "
+                       f"expected one of {', '.join(allowedFields)}")
+    if isinstance(allowedFields, dict):
+      checkTypes(self.tree, allowedFields)
+
+    # Row predicate: fields are read with row[...] straight from the row.
+    rowSource = toSource(self.tree, lambda name: f'row[{name!r}]', nullableFields)
+    self.predicate = self.compile(f'lambda row: {rowSource}')
+
+    # Column selector: fields are bound to local names c0, c1, ... and whole
+    # columns are zipped, so a column store is scanned in one comprehension
+    # without building a row or looking up a key per row.
+    names = {name: f'c{i}' for i, name in enumerate(self.fields)}
+    columnSource = toSource(self.tree, names.__getitem__, nullableFields)
+    columns = ', '.join(names.values())
+    if not self.fields:
+      selector = f'lambda length: [i for i in range(length) if {columnSource}]'
+    else:
+      selector = (f'lambda length, {columns}: '
+                  f'[i for i, ({columns},) in enumerate(zip({columns})) if {columnSource}]')
+    self.selector = self.compile(selector)
+
+  def compile(self, source):
+    scope = {'__builtins__': {}, 'enumerate': enumerate, 'range': range, 'zip': zip}
+    return eval(compile(source, f'<filter {self.expression!r}>', 'eval'), scope)
+
+  def __call__(self, row):
+    return self.predicate(row)
+
+  def select(self, table):
+    # Returns the indices of matching rows of a column store.
+    return self.selector(len(table), *(table.column(name) for name in self.fields))
+
+  def apply(self, rows):
+    # Column stores are filtered column-wise; anything else lazily row by row.
+    if hasattr(rows, 'column'):
+      return [rows[i] for i in self.select(rows)]
+    return filter(self.predicate, rows)
+
+def compileFilter(expression, allowedFields=None, nullableFields=()):
+  return Filter(expression, allowedFields, nullableFields)
@@ -1,17 +1,227 @@
-import json
+import sys
+from itertools import chain, islice
+from operator import itemgetter
 
-def prettyPrintJSON(obj, indent=1):
-  print(json.dumps(obj, indent))
+from textwidth import clip, displayWidth, padLeft
 
-def printTable(keys, rows):
-  table = [[key] + [str(row[key]) for row in rows] for key in keys]
-  columnWidths = [max(len(row) for row in column) for column in table]
-  numColumns = len(keys)
-  lineLength = sum(columnWidths) + 3 * numColumns
+def prettyPrintJSON(obj, indent=1, file=None, maxDepth=None, path=None):
+  # Pretty-prints obj, or the part of it at path, writing the encoder's
+  # chunks as they come instead of building the whole text first. Objects
+  # and arrays nested deeper than maxDepth are replaced by a string saying
+  # how many members or elements they have.
+  import json
 
-  print(*[k.rjust(columnWidths[i]) for i, k in enumerate(keys)], sep=' | ')
-  print(lineLength * '=')
+  parts = parsePath(path)
+  for depth, part in enumerate(parts):
+    if isinstance(obj, dict) and part in obj:
+      obj = obj[part]
+    elif isinstance(obj, list) and isIndex(part) and int(part) < len(obj):
+      obj = obj[int(part)]
+    else:
+      raise KeyError('.'.join(parts[:depth + 1]))
+  if maxDepth is not None:
+    obj = limitDepth(obj, maxDepth)
+  writeChunks(file, chain(json.JSONEncoder(indent=indent).iterencode(obj), '\n'))
 
-  for row in rows:
-    values = [str(row[k]) for k in keys]
-    print(*[v.rjust(columnWidths[i]) for i, v in enumerate(values)], sep=' | ')
+def prettyPrintJSONStream(chunks, indent=1, file=None, maxDepth=None, path=None):
+  # prettyPrintJSON for a JSON document arriving as byte chunks, such as a
+  # streamed HTTP body. Objects are walked member by member, while each array
+  # element is decoded and encoded whole, so memory is bounded by the largest
+  # element (one country record in the summary) rather than by the document.
+  # Parts outside path are skipped without being built, and reading stops
+  # once the selected value has been printed. The output is the same as
+  # prettyPrintJSON's for the parsed document.
+  import json
+  from jsonstream import JSONStream
+
+  stream = JSONStream(chunks)
+  parts = parsePath(path)
+  for depth, part in enumerate(parts):
+    char = stream.peek()
+    if char == '{':
+      entries = stream.members()
+    elif char == '[' and isIndex(part):
+      entries, part = enumerate(stream.elements()), int(part)
+    else:
+      entries = ()
+    for key, value in entries:
+      if key == part:
+        break
+      value.skip()
+    else:
+      raise KeyError('.'.join(parts[:depth + 1]))
+  encoder = json.JSONEncoder(indent=indent)
+  writeChunks(file, chain(iterPrettyStream(stream, encoder, ' ' * indent, maxDepth, 0), '\n'))
+
+def parsePath(path):
+  # 'Countries.0.Country' -> ['Countries', '0', 'Country']. A part is only
+  # read as an index where the value it selects from is an array, so all
+  # digit object keys such as years still work. A path that selects nothing
+  # raises KeyError with the path up to the part that failed.
+  if path is None or path == '':
+    return []
+  parts = path.split('.') if isinstance(path, str) else path
+  return [str(part) for part in parts]
+
+def isIndex(part):
+  return part.isascii() and part.isdigit()
+
+def limitDepth(obj, maxDepth, depth=0):
+  if isinstance(obj, (dict, list)) and obj and depth >= maxDepth:
+    return elided(obj)
+  if isinstance(obj, dict):
+    return {key: limitDepth(value, maxDepth, depth + 1) for key, value in obj.items()}
+  if isinstance(obj, list):
+    return [limitDepth(value, maxDepth, depth + 1) for value in obj]
+  return obj
+
+def elided(container, count=None):
+  count = len(container) if count is None else count
+  if isinstance(container, dict) or container == '{':
+    return f'... {count} members'
+  return f'... {count} elements'
+
+def iterPrettyStream(stream, encoder, indent, maxDepth, depth):
+  # Yields the same text as encoder.iterencode for the value at the stream's
+  # position, with the encoder's indent string passed as indent.
+  char = stream.peek()
+  if char not in '{[':
+    yield encoder.encode(stream.value())
+  elif maxDepth is not None and depth >= maxDepth:
+    count = stream.skip()
+    yield encoder.encode(elided(char, count)) if count else char + ('}' if char == '{' else ']')
+  else:
+    newline = '\n' + indent * (depth + 1)
+    separator = char
+    if char == '{':
+      for key, value in stream.members():
+        yield separator + newline + encoder.encode(key) + ': '
+        yield from iterPrettyStream(value, encoder, indent, maxDepth, depth + 1)
+        separator = ','
+    else:
+      for element in stream.elements():
+        value = element.value()
+        if maxDepth is not None:
+          value = limitDepth(value, maxDepth, depth + 1)
+        # Encoded output has no raw newlines inside strings, so indenting
+        # every line break nests the element at this depth.
+        yield separator + newline + encoder.encode(value).replace('\n', newline)
+        separator = ','
+    close = '}' if char == '{' else ']'
+    yield char + close if separator == char else '\n' + indent * depth + close
+
+def writeChunks(file, chunks, bufferSize=64 * 1024):
+  # Gathers small chunks into writes of about bufferSize characters.
+  file = file if file is not None else sys.stdout
+  pending, size = [], 0
+  for chunk in chunks:
+    pending.append(chunk)
+    size += len(chunk)
+    if size >= bufferSize:
+      file.write(''.join(pending))
+      pending, size = [], 0
+  file.write(''.join(pending))
+
+def writeLines(file, lines, linesPerWrite=4096):
+  # Joins lines into one write() per linesPerWrite lines.
+  while True:
+    chunk = list(islice(lines, linesPerWrite))
+    if not chunk:
+      break
+    chunk.append('')
+    file.write('\n'.join(chunk))
+
+def writeHeader(file, keys, columnWidths):
+  header = ' | '.join(map(padLeft, keys, columnWidths))
+  file.write(header + '\n' + (sum(columnWidths) + 3 * len(keys)) * '=' + '\n')
+
+def cellText(value):
+  # Missing values, such as the enrichment of countries without metadata,
+  # stay None in the rows so that filters can tell them apart, and print
+  # as blank cells.
+  return '' if value is None else str(value)
+
+def printTable(keys, rows, file=None, linesPerWrite=4096):
+  # Each cell is converted with cellText() once, column by column, and the widths
+  # come from the same lists. Columns are sized and padded by display width,
+  # which for an all-ASCII column is plain len() and rjust(). The padded
+  # lines go out linesPerWrite at a time as one write() each instead of one
+  # print() per row.
+  file = file if file is not None else sys.stdout
+  columns = []
+  for key in keys:
+    values = [row[key] for row in rows]
+    columns.append(list(map(cellText if None in values else str, values)))
+  columnWidths, padded = [], []
+  for key, column in zip(keys, columns):
+    if key.isascii() and ''.join(column).isascii():
+      width = max(len(key), max(map(len, column), default=0))
+      padded.append([cell.rjust(width) for cell in column])
+    else:
+      cellWidths = list(map(displayWidth, column))
+      width = max(displayWidth(key), max(cellWidths, default=0))
+      padded.append([' ' * (width - cellWidth) + cell
+                     for cell, cellWidth in zip(column, cellWidths)])
+    columnWidths.append(width)
+  writeHeader(file, keys, columnWidths)
+  writeLines(file, map(' | '.join, zip(*padded)), linesPerWrite)
+
+def printTableStream(keys, rows, file=None, widths='grow', sampleSize=1000, linesPerWrite=4096):
+  # printTable for any iterable, read once and holding a bounded number of
+  # rows. With 'grow' or 'truncate' the widths come from the first sampleSize
+  # rows; a later cell that does not fit widens its column from that line on
+  # or is cut to fit with a trailing ellipsis. With 'spill' every row is
+  # stringified into a temporary file while the widths are measured and the
+  # table is printed from that file, so it comes out exactly as printTable
+  # would print it. Widths are display widths, as in printTable.
+  if widths not in ('grow', 'truncate', 'spill'):
+    raise ValueError(f'Unknown width strategy {widths!r}')
+  file = file if file is not None else sys.stdout
+  getter = itemgetter(*keys) if len(keys) > 1 else lambda row: (row[keys[0]],)
+  cells = (tuple(map(cellText if None in values else str, values))
+           for values in map(getter, rows))
+
+  if widths == 'spill':
+    import marshal
+    import tempfile
+
+    # marshal rather than pickle: a Pickler memoizes, and so keeps alive,
+    # every row it has written.
+    columnWidths = list(map(displayWidth, keys))
+    with tempfile.TemporaryFile() as spill:
+      for row in cells:
+        columnWidths = list(map(max, columnWidths, map(displayWidth, row)))
+        marshal.dump(row, spill)
+      spill.seek(0)
+      writeHeader(file, keys, columnWidths)
+      writeLines(file, (' | '.join(map(padLeft, row, columnWidths)) for row in unmarshalAll(spill)),
+                 linesPerWrite)
+    return
+
+  sample = list(islice(cells, sampleSize))
+  columnWidths = [max(displayWidth(key), max((displayWidth(row[i]) for row in sample), default=0))
+                  for i, key in enumerate(keys)]
+  writeHeader(file, keys, columnWidths)
+
+  def lines():
+    for row in chain(sample, cells):
+      cellWidths = list(map(displayWidth, row))
+      if any(map(int.__gt__, cellWidths, columnWidths)):
+        if widths == 'grow':
+          columnWidths[:] = map(max, columnWidths, cellWidths)
+        else:
+          row = [cell if cellWidth <= width else clip(cell, width - 1) + '…'
+                 for cell, cellWidth, width in zip(row, cellWidths, columnWidths)]
+      yield ' | '.join(map(padLeft, row, columnWidths))
+
+  sample = iter(sample)
+  writeLines(file, lines(), linesPerWrite)
+
+def unmarshalAll(file):
+  import marshal
+
+  while True:
+    try:
+      yield marshal.load(file)
+    except EOFError:
+      return
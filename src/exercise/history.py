@@ -0,0 +1,119 @@
+import datetime
+import sqlite3
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS snapshots (
+  country TEXT NOT NULL,
+  date TEXT NOT NULL,
+  seq INTEGER NOT NULL,
+  newConfirmed INTEGER NOT NULL,
+  totalConfirmed INTEGER NOT NULL,
+  newDeaths INTEGER NOT NULL,
+  totalDeaths INTEGER NOT NULL,
+  newConfirmedWindow INTEGER NOT NULL,
+  newDeathsWindow INTEGER NOT NULL,
+  avgNewConfirmed REAL NOT NULL,
+  avgNewDeaths REAL NOT NULL,
+  growthRate REAL,
+  PRIMARY KEY (country, date)
+) WITHOUT ROWID;
+CREATE UNIQUE INDEX IF NOT EXISTS snapshotsBySeq ON snapshots (country, seq);
+'''
+
+COLUMNS = ['country', 'date', 'newConfirmed', 'totalConfirmed', 'newDeaths', 'totalDeaths',
+           'avgNewConfirmed', 'avgNewDeaths', 'growthRate']
+
+class HistoryStore:
+  # Append-only history of summary snapshots keyed by (country, date). The
+  # rolling window covers the last `window` calendar days, so a skipped day
+  # shortens it instead of stretching it back in time: each insert carries
+  # the window sums forward from the previous row and subtracts the rows
+  # whose dates have left the window since, and the averages are over the
+  # snapshots still in it. growthRate is the compound daily growth of
+  # TotalConfirmed since the previous snapshot. A second run on the latest
+  # date replaces that day's row; rows older than it are ignored.
+  def __init__(self, path, window=7):
+    self.window = window
+    self.db = sqlite3.connect(path)
+    self.db.executescript(SCHEMA)
+
+  def record(self, countries):
+    for _ in self.recording(countries):
+      pass
+
+  def recording(self, countries):
+    # Passes countries through while inserting them, committing once the
+    # stream is exhausted, so streamed summaries can be recorded too.
+    with self.db:
+      for country in countries:
+        self.insert(country['CountryCode'], country['Date'][:10], country)
+        yield country
+
+  def latest(self, code):
+    return self.db.execute(
+      'SELECT date, seq, totalConfirmed, newConfirmedWindow, newDeathsWindow FROM snapshots '
+      'WHERE country = ? ORDER BY date DESC LIMIT 1', (code,)).fetchone()
+
+  def insert(self, code, date, row):
+    last = self.latest(code)
+    if last is not None and date == last[0]:
+      self.db.execute('DELETE FROM snapshots WHERE country = ? AND date = ?', (code, date))
+      last = self.latest(code)
+    elif last is not None and date < last[0]:
+      return
+
+    day = datetime.date.fromisoformat(date)
+    cutoff = str(day - datetime.timedelta(days=self.window))
+    if last:
+      seq, prevTotal, confirmedWindow, deathsWindow = last[1] + 1, *last[2:]
+      lastDay = datetime.date.fromisoformat(last[0])
+      left = self.db.execute(
+        'SELECT total(newConfirmed), total(newDeaths) FROM snapshots '
+        'WHERE country = ? AND date > ? AND date <= ?',
+        (code, str(lastDay - datetime.timedelta(days=self.window)), cutoff)).fetchone()
+      confirmedWindow -= int(left[0])
+      deathsWindow -= int(left[1])
+    else:
+      seq, prevTotal, confirmedWindow, deathsWindow = 0, None, 0, 0
+    confirmedWindow += row['NewConfirmed']
+    deathsWindow += row['NewDeaths']
+
+    # Rows are numbered in date order, so the newest row outside the window
+    # tells how many are inside it.
+    outside = self.db.execute(
+      'SELECT seq FROM snapshots WHERE country = ? AND date <= ? ORDER BY date DESC LIMIT 1',
+      (code, cutoff)).fetchone()
+    count = seq - (outside[0] if outside else -1)
+    growthRate = None
+    if prevTotal:
+      days = (day - lastDay).days
+      growthRate = (row['TotalConfirmed'] / prevTotal) ** (1 / days) - 1
+    self.db.execute('INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', (
+      code, date, seq, row['NewConfirmed'], row['TotalConfirmed'], row['NewDeaths'],
+      row['TotalDeaths'],
+      confirmedWindow, deathsWindow, confirmedWindow / count, deathsWindow / count, growthRate))
+
+  def lastDays(self, code, days):
+    cursor = self.db.execute(
+      f"SELECT {', '.join(COLUMNS)} FROM snapshots WHERE country = ? AND date > "
+      "(SELECT date(max(date), ?) FROM snapshots WHERE country = ?) ORDER BY date",
+      (code, f'-{int(days)} days', code))
+    return [dict(zip(COLUMNS, row)) for row in cursor]
+
+  def close(self):
+    self.db.close()
+
+
+if __name__ == '__main__':
+  import argparse
+  from helper import printTable
+
+  parser = argparse.ArgumentParser(description='Show the recorded history of one country.')
+  parser.add_argument('database', help='history database written by main.py --history')
+  parser.add_argument('country', help='alpha-2 country code')
+  parser.add_argument('--days', type=int, default=14, help='number of days to show')
+  args = parser.parse_args()
+
+  store = HistoryStore(args.database)
+  printTable(COLUMNS[1:], store.lastDays(args.country.upper(), args.days))
+  store.close()
@@ -0,0 +1,87 @@
+import hashlib
+import json
+import os
+import time
+
+class DiskCache:
+  def __init__(self, directory, ttl=3600):
+    self.directory = directory
+    self.ttl = ttl
+    self.stats = {'hits': 0, 'misses': 0, 'revalidations': 0}
+    # Parsed bodies keyed by (url, validator) so a fresh hit or a 304 inside
+    # one process hands back the already decoded object.
+    self.parsed = {}
+    os.makedirs(directory, exist_ok=True)
+
+  def paths(self, url):
+    key = os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest())
+    return key + '.json', key + '.body'
+
+  def load(self, url):
+    metaPath, bodyPath = self.paths(url)
+    try:
+      with open(metaPath) as f:
+        meta = json.load(f)
+    except (OSError, ValueError):
+      return None
+    return meta if meta.get('url') == url and os.path.exists(bodyPath) else None
+
+  def isFresh(self, meta):
+    return time.time() - meta['storedAt'] < self.ttl
+
+  def conditionalHeaders(self, meta):
+    headers = {}
+    if meta.get('etag'):
+      headers['If-None-Match'] = meta['etag']
+    if meta.get('lastModified'):
+      headers['If-Modified-Since'] = meta['lastModified']
+    return headers
+
+  def readJSON(self, meta):
+    key = (meta['url'], meta.get('etag'), meta.get('lastModified'))
+    if key not in self.parsed:
+      with open(self.paths(meta['url'])[1], 'rb') as f:
+        self.parsed[key] = json.load(f)
+    return self.parsed[key]
+
+  def iterBody(self, meta, chunkSize=64 * 1024):
+    with open(self.paths(meta['url'])[1], 'rb') as f:
+      yield from iter(lambda: f.read(chunkSize), b'')
+
+  def storeStream(self, url, chunks, headers):
+    # Passes chunks through while writing them to the cache; the entry only
+    # becomes visible once the whole body has been read, and a reader that
+    # stops early leaves nothing behind.
+    metaPath, bodyPath = self.paths(url)
+    tmpPath = f'{bodyPath}.{os.getpid()}.tmp'
+    try:
+      with open(tmpPath, 'wb') as f:
+        for chunk in chunks:
+          f.write(chunk)
+          yield chunk
+    except BaseException:
+      os.remove(tmpPath)
+      raise
+    os.replace(tmpPath, bodyPath)
+    meta = {'url': url, 'etag': headers.get('ETag'), 'lastModified': headers.get('Last-Modified'),
+            'storedAt': time.time()}
+    self.writeAtomic(metaPath, json.dumps(meta).encode())
+
+  def store(self, url, body, headers):
+    meta = {'url': url, 'etag': headers.get('ETag'), 'lastModified': headers.get('Last-Modified'),
+            'storedAt': time.time()}
+    metaPath, bodyPath = self.paths(url)
+    self.writeAtomic(bodyPath, body)
+    self.writeAtomic(metaPath, json.dumps(meta).encode())
+    return meta
+
+  def refresh(self, meta):
+    meta = dict(meta, storedAt=time.time())
+    self.writeAtomic(self.paths(meta['url'])[0], json.dumps(meta).encode())
+    return meta
+
+  def writeAtomic(self, path, data):
+    tmpPath = f'{path}.{os.getpid()}.tmp'
+    with open(tmpPath, 'wb') as f:
+      f.write(data)
+    os.replace(tmpPath, path)
@@ -0,0 +1,133 @@
+import codecs
+import json
+
+WHITESPACE = ' \t\n\r'
+NUMBER_START = '-0123456789'
+NUMBER_CONTINUE = '.eE+-'
+
+class JSONStream:
+  # Pulls text from an iterator of byte chunks on demand and decodes one
+  # JSON value at a time, keeping only the not yet consumed tail buffered.
+  def __init__(self, chunks):
+    self.chunks = iter(chunks)
+    self.decoder = codecs.getincrementaldecoder('utf-8')()
+    self.jsonDecoder = json.JSONDecoder()
+    self.buffer = ''
+    self.pos = 0
+    self.eof = False
+
+  def fill(self):
+    if self.eof:
+      return False
+    chunk = next(self.chunks, None)
+    if chunk is None:
+      self.eof = True
+      self.buffer = self.buffer[self.pos:] + self.decoder.decode(b'', final=True)
+    else:
+      self.buffer = self.buffer[self.pos:] + self.decoder.decode(chunk)
+    self.pos = 0
+    return True
+
+  def peek(self):
+    while True:
+      while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+        self.pos += 1
+      if self.pos < len(self.buffer):
+        return self.buffer[self.pos]
+      if not self.fill():
+        raise ValueError('Unexpected end of JSON stream')
+
+  def expect(self, char):
+    if self.peek() != char:
+      raise ValueError(f'Expected {char!r} at offset {self.pos} of JSON stream, '
+                       f'got {self.buffer[self.pos]!r}')
+    self.pos += 1
+
+  def value(self):
+    self.peek()
+    while True:
+      try:
+        value, end = self.jsonDecoder.raw_decode(self.buffer, self.pos)
+        # A number that reaches the end of the buffer, or stops right before
+        # a fraction or exponent, may continue in the next chunk.
+        if self.eof or not (self.buffer[self.pos] in NUMBER_START and
+                            (end == len(self.buffer) or self.buffer[end] in NUMBER_CONTINUE)):
+          self.pos = end
+          return value
+      except json.JSONDecodeError:
+        if self.eof:
+          raise
+      self.fill()
+
+  def items(self):
+    # Iterates the elements of the array starting at the current position.
+    self.expect('[')
+    if self.peek() == ']':
+      self.pos += 1
+      return
+    while True:
+      yield self.value()
+      if self.peek() == ']':
+        self.pos += 1
+        return
+      self.expect(',')
+
+  def elements(self):
+    # Like items(), but yields the stream positioned at each element, which
+    # the caller must consume before asking for the next, as with members().
+    self.expect('[')
+    if self.peek() == ']':
+      self.pos += 1
+      return
+    while True:
+      yield self
+      if self.peek() == ']':
+        self.pos += 1
+        return
+      self.expect(',')
+
+  def skip(self):
+    # Consumes the value at the current position without building it and
+    # returns how many members or elements it had (None for a scalar).
+    char = self.peek()
+    if char == '{':
+      count = 0
+      for _, value in self.members():
+        value.skip()
+        count += 1
+      return count
+    if char == '[':
+      count = 0
+      for element in self.elements():
+        element.skip()
+        count += 1
+      return count
+    self.value()
+    return None
+
+  def members(self):
+    # Iterates (key, stream) for each member of the object at the current
+    # position; the caller must consume the value before asking for the next.
+    self.expect('{')
+    if self.peek() == '}':
+      self.pos += 1
+      return
+    while True:
+      key = self.value()
+      self.expect(':')
+      yield key, self
+      if self.peek() == '}':
+        self.pos += 1
+        return
+      self.expect(',')
+
+def iterSummary(chunks):
+  # Yields ('Global', block) and then ('Country', record) per country, in
+  # payload order, without building the Countries list.
+  stream = JSONStream(chunks)
+  for key, value in stream.members():
+    if key == 'Countries':
+      for country in value.items():
+        yield 'Country', country
+    else:
+      yield key, value.value()
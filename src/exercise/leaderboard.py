@@ -0,0 +1,185 @@
+import threading
+from collections import OrderedDict
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+from operator import itemgetter, neg
+
+class SortedList:
+  # Sorted sequence kept as a list of short sorted sublists plus the maximum
+  # of each, the layout of sortedcontainers.SortedList: finding a position is
+  # a bisect over the maxima and then within one sublist, and an insert or
+  # removal only moves at most 2 * load items instead of shifting the whole
+  # list.
+  def __init__(self, values=(), load=500, presorted=False):
+    self.load = load
+    values = list(values) if presorted else sorted(values)
+    self.lists = [values[i:i + load] for i in range(0, len(values), load)]
+    self.maxes = [sub[-1] for sub in self.lists]
+    self.length = len(values)
+
+  def __len__(self):
+    return self.length
+
+  def add(self, value):
+    lists, maxes = self.lists, self.maxes
+    if not maxes:
+      lists.append([value])
+      maxes.append(value)
+    else:
+      i = min(bisect_right(maxes, value), len(maxes) - 1)
+      sub = lists[i]
+      insort(sub, value)
+      maxes[i] = sub[-1]
+      if len(sub) > 2 * self.load:
+        lists.insert(i + 1, sub[self.load:])
+        del sub[self.load:]
+        maxes.insert(i, sub[-1])
+    self.length += 1
+
+  def remove(self, value):
+    lists, maxes = self.lists, self.maxes
+    i = bisect_left(maxes, value)
+    if i < len(maxes):
+      sub = lists[i]
+      j = bisect_left(sub, value)
+      if sub[j] == value:
+        del sub[j]
+        if sub:
+          maxes[i] = sub[-1]
+        else:
+          del lists[i], maxes[i]
+        self.length -= 1
+        return
+    raise ValueError(f'{value!r} not in SortedList')
+
+  def __iter__(self):
+    for sub in self.lists:
+      yield from sub
+
+  def __reversed__(self):
+    for sub in reversed(self.lists):
+      yield from reversed(sub)
+
+class Leaderboard:
+  # Rows in descending sortBy order, kept as (*values, -seq, code) entries in
+  # ascending order and read back to front. seq is the row's position in the
+  # latest summary, so ties come out in payload order like the stable sort in
+  # main.sortCountries. rows and seqs must iterate in the same code order;
+  # the entries are then built column by column and sorted as plain tuples,
+  # which is about the cost of sortCountries itself.
+  def __init__(self, sortBy, rows, seqs):
+    self.sortBy = list(sortBy)
+    self.key = itemgetter(*sortBy) if len(sortBy) > 1 else lambda row: (row[sortBy[0]],)
+    values = list(rows.values())
+    entries = list(zip(*(map(itemgetter(key), values) for key in sortBy),
+                       map(neg, seqs.values()), rows))
+    self.entries = dict(zip(rows, entries))
+    entries.sort()
+    self.order = SortedList(entries, presorted=True)
+
+  def entry(self, row, seq):
+    return (*self.key(row), -seq, row['CountryCode'])
+
+  def update(self, row, seq):
+    new = self.entry(row, seq)
+    old = self.entries.get(new[-1])
+    if old != new:
+      if old is not None:
+        self.order.remove(old)
+      self.order.add(new)
+      self.entries[new[-1]] = new
+
+  def remove(self, code):
+    self.order.remove(self.entries.pop(code))
+
+  def codes(self, top=None):
+    return (entry[-1] for entry in islice(reversed(self.order), top))
+
+class Leaderboards:
+  # One Leaderboard per sortBy view over the latest rows, keyed by
+  # CountryCode. update() diffs a new summary against the previous one and
+  # only moves the rows whose values or position changed, so a refresh where
+  # a few countries changed costs a few O(log n) updates per view instead of
+  # a full sort. A country added or removed mid-list shifts the position of
+  # every row after it; when more than rebuildFraction of the rows changed,
+  # rebuilding the views with one sort each is cheaper than moving rows one
+  # at a time (bench_leaderboard puts the crossover at 15-20% of the rows,
+  # so the default leaves a margin). At most maxViews leaderboards are kept, least recently viewed
+  # first out, since every one of them is updated on each refresh.
+  def __init__(self, rebuildFraction=0.1, maxViews=16):
+    self.rebuildFraction = rebuildFraction
+    self.maxViews = maxViews
+    self.rows = {}
+    self.seqs = {}
+    self.codes = []
+    self.rowList = []
+    self.boards = OrderedDict()
+    self.lock = threading.Lock()
+    self.stats = {'updates': 0, 'rebuilds': 0, 'changed': 0, 'removed': 0, 'evicted': 0}
+
+  def update(self, countries):
+    countries = list(countries)
+    codes = list(map(itemgetter('CountryCode'), countries))
+    with self.lock:
+      oldRows, oldSeqs = self.rows, self.seqs
+      # The diff stops as soon as it is large enough to rebuild instead.
+      limit = int(len(countries) * self.rebuildFraction)
+      if codes == self.codes:
+        # Same countries in the same order, which is the usual refresh: only
+        # values can have changed.
+        rows, seqs, removed = oldRows, oldSeqs, ()
+        changed = list(islice((row for row, old in zip(countries, self.rowList)
+                               if row is not old and row != old), limit + 1))
+        if len(changed) > limit:
+          rows = self.rows = dict(zip(codes, countries))
+        else:
+          for row in changed:
+            rows[row['CountryCode']] = row
+      else:
+        rows = self.rows = dict(zip(codes, countries))
+        seqs = self.seqs = dict(zip(codes, range(len(codes))))
+        changed = list(islice((row for code, row in rows.items()
+                               if oldSeqs.get(code) != seqs[code] or oldRows.get(code) != row),
+                              limit + 1))
+        removed = ()
+        if len(changed) <= limit:
+          added = sum(1 for row in changed if row['CountryCode'] not in oldRows)
+          removed = oldRows.keys() - rows.keys() if len(oldRows) + added > len(rows) else ()
+      self.codes, self.rowList = codes, countries
+      if len(changed) + len(removed) > limit:
+        for sortBy in self.boards:
+          self.boards[sortBy] = Leaderboard(sortBy, rows, seqs)
+        self.stats['rebuilds'] += 1
+      else:
+        for board in self.boards.values():
+          for code in removed:
+            board.remove(code)
+          for row in changed:
+            board.update(row, seqs[row['CountryCode']])
+        self.stats['changed'] += len(changed)
+        self.stats['removed'] += len(removed)
+      self.stats['updates'] += 1
+
+  def view(self, sortBy, top=None):
+    # Returns the top rows for sortBy, building its leaderboard on first use.
+    # Raises KeyError for a key the rows do not have and ValueError for a
+    # repeated key.
+    sortBy = tuple(sortBy)
+    if len(set(sortBy)) != len(sortBy):
+      raise ValueError(f'Repeated sort key in {list(sortBy)}')
+    with self.lock:
+      if not self.rows:
+        return []
+      board = self.boards.get(sortBy)
+      if board is None:
+        sample = next(iter(self.rows.values()))
+        for key in sortBy:
+          if key not in sample:
+            raise KeyError(key)
+        board = self.boards[sortBy] = Leaderboard(sortBy, self.rows, self.seqs)
+        if len(self.boards) > self.maxViews:
+          self.boards.popitem(last=False)
+          self.stats['evicted'] += 1
+      else:
+        self.boards.move_to_end(sortBy)
+      return [self.rows[code] for code in board.codes(top)]
@@ -0,0 +1,46 @@
+import threading
+import time
+from collections import OrderedDict
+
+class LRUCache:
+  def __init__(self, maxSize=256, ttl=24 * 3600, clock=time.monotonic):
+    self.maxSize = maxSize
+    self.ttl = ttl
+    self.clock = clock
+    self.entries = OrderedDict()
+    self.lock = threading.Lock()
+    self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+  def get(self, key):
+    # Returns (found, value) so that a cached None (a negative entry) can be
+    # told apart from a miss.
+    with self.lock:
+      entry = self.entries.get(key)
+      if entry is None or entry[1] <= self.clock():
+        if entry is not None:
+          del self.entries[key]
+        self.stats['misses'] += 1
+        return False, None
+      self.entries.move_to_end(key)
+      self.stats['hits'] += 1
+      return True, entry[0]
+
+  def put(self, key, value, ttl=None):
+    with self.lock:
+      self.entries[key] = (value, self.clock() + (self.ttl if ttl is None else ttl))
+      self.entries.move_to_end(key)
+      while len(self.entries) > self.maxSize:
+        self.entries.popitem(last=False)
+        self.stats['evictions'] += 1
+
+  def __contains__(self, key):
+    with self.lock:
+      entry = self.entries.get(key)
+      return entry is not None and entry[1] > self.clock()
+
+  def __len__(self):
+    return len(self.entries)
+
+  def clear(self):
+    with self.lock:
+      self.entries.clear()
@@ -1,31 +1,351 @@
-import requests
-import json
+import heapq
+import os
+import sys
+from itertools import chain, islice
+from operator import itemgetter
 
-from helper import *
+from client import CovidClient
+from columns import NUMERIC_KEYS, STRING_KEYS
+from helper import prettyPrintJSONStream, printTable, printTableStream
+from lrucache import LRUCache
+from policy import RequestPolicy
+from profiling import profiler
+from ratelimit import RateLimiter
+from snapshot import SnapshotTable, writeSnapshot
 
-def getCountryData(countryCode):
-  res = requests.get(f'https://restcountries.eu/rest/v2/alpha/{countryCode}')
-  res.raise_for_status()
-  return res.json()
+# Modules only some code paths need (requests, the enrichment thread pool,
+# the streaming parser, the disk cache, SQLite history) are imported where
+# they are used, so rendering from a snapshot never loads the HTTP stack.
 
-def getCovidGlobalSummary():
-  res = requests.get('https://api.covid19api.com/summary')
-  res.raise_for_status()
-  return res.json()
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'covid-exercise')
+SNAPSHOT_PATH = os.path.join(CACHE_DIR, 'summary.snap')
+SUMMARY_KEYS = ['Country', 'NewConfirmed', 'TotalConfirmed', 'NewDeaths', 'TotalDeaths']
+EXPORT_KEYS = ['Country', 'CountryCode', 'NewConfirmed', 'TotalConfirmed', 'NewDeaths',
+               'TotalDeaths', 'NewRecovered', 'TotalRecovered', 'Date']
+ENRICH_TYPES = {'Population': int, 'Region': str}
 
-def printGlobalSummary(sortBy=['TotalConfirmed', 'NewConfirmed']):
-  summary = getCovidGlobalSummary()
-  globalCases, countries = summary['Global'], summary['Countries']
+limiter = RateLimiter(rate=10, burst=10)
+client = CovidClient(policy=RequestPolicy(), limiter=limiter)
+summaryCache = None
+countryCache = LRUCache(maxSize=512, ttl=24 * 3600)
+NOT_FOUND_TTL = 3600
 
-  for sortKey in reversed(sortBy):
-    countries.sort(key=lambda x: x[sortKey], reverse=True)
+def getCountryData(countryCode, timeout=None):
+  # Returns None for codes the API does not know; those are cached too so
+  # that every row with an unknown code does not hit the API again.
+  countryCode = countryCode.upper()
+  found, data = countryCache.get(countryCode)
+  if found:
+    return data
 
-  print(f"Summary: global cases: {globalCases['TotalConfirmed']} (+{globalCases['NewConfirmed']}) confirmed", end=', ')
-  print(f"{globalCases['TotalDeaths']} (+{globalCases['NewDeaths']}) deaths")
-  print()
+  import requests
 
-  printTable(['Country', 'NewConfirmed', 'TotalConfirmed', 'NewDeaths', 'TotalDeaths'], countries)
+  try:
+    data = client.getJSON(f'{client.countriesApi}/alpha/{countryCode}', timeout=timeout)
+  except requests.HTTPError as error:
+    if error.response is None or error.response.status_code != 404:
+      raise
+    countryCache.put(countryCode, None, ttl=NOT_FOUND_TTL)
+    return None
+
+  countryCache.put(countryCode, data)
+  return data
+
+def fetchCountriesChunk(codes, timeout=None):
+  found = client.getJSON(f"{client.countriesApi}/alpha?codes={';'.join(codes)}", timeout=timeout)
+  byCode = {}
+  for data in filter(None, found):
+    byCode[data.get('alpha2Code', '').upper()] = byCode[data.get('alpha3Code', '').upper()] = data
+  return {code: byCode.get(code) for code in codes}
+
+def getCountriesData(codes, chunkSize=50, maxWorkers=4, timeout=10):
+  # Looks codes up through the multi-code endpoint, chunkSize codes per
+  # request and at most maxWorkers requests at a time. Returns a dict keyed
+  # by upper-cased code; codes the API does not return map to None, and
+  # codes whose chunk failed are reported and left out.
+  from enrich import fetchConcurrently
+
+  result, missing = {}, []
+  for code in dict.fromkeys(code.upper() for code in codes):
+    found, data = countryCache.get(code)
+    if found:
+      result[code] = data
+    else:
+      missing.append(code)
+
+  chunks = [tuple(missing[i:i + chunkSize]) for i in range(0, len(missing), chunkSize)]
+  for chunk, found, error in fetchConcurrently(chunks, fetchCountriesChunk, maxWorkers, timeout):
+    if error is not None:
+      print(f"Could not fetch countries {', '.join(chunk)}: {error}", file=sys.stderr)
+      continue
+    for code, data in found.items():
+      countryCache.put(code, data, ttl=None if data is not None else NOT_FOUND_TTL)
+      result[code] = data
+  return result
+
+def prewarm(codes, maxWorkers=4, timeout=10):
+  getCountriesData(codes, maxWorkers=maxWorkers, timeout=timeout)
+
+def getCovidGlobalSummary(stream=False):
+  # With stream=True the payload is parsed while it downloads and comes back
+  # as ('Global', block) and ('Country', record) events instead of one dict.
+  url = f'{client.covidApi}/summary'
+  if stream:
+    from jsonstream import iterSummary
+    return profiler.iterate('decode', iterSummary(client.iterContent(url, cache=summaryCache)))
+  return client.getJSON(url, cache=summaryCache)
+
+def printRawSummary(path=None, maxDepth=None, file=None):
+  # Pretty-prints the summary payload, or the part of it at path, while it
+  # downloads.
+  chunks = client.iterContent(f'{client.covidApi}/summary', cache=summaryCache)
+  prettyPrintJSONStream(chunks, file=file, maxDepth=maxDepth, path=path)
+
+def iterCountries(events, summary):
+  for key, value in events:
+    if key == 'Country':
+      yield value
+    else:
+      summary[key] = value
+
+def enrichGlobalSummary(countries, maxWorkers=4, timeout=10):
+  metadata = getCountriesData([country['CountryCode'] for country in countries],
+                              maxWorkers=maxWorkers, timeout=timeout)
+  for country in countries:
+    data = metadata.get(country['CountryCode'].upper())
+    country['Population'] = data['population'] if data else None
+    country['Region'] = data['region'] if data else None
+
+def compileWhere(where, enrich=False):
+  # Checks a filter against the fields the rows will have, and their types,
+  # so that a bad filter fails before anything is fetched. Enriched fields are
+  # None for countries without metadata and never match an ordering.
+  from filterexpr import compileFilter
+
+  fieldTypes = {**dict.fromkeys(STRING_KEYS, str), **dict.fromkeys(NUMERIC_KEYS, int)}
+  if enrich:
+    fieldTypes.update(ENRICH_TYPES)
+  return compileFilter(where, fieldTypes, ENRICH_TYPES.keys() if enrich else ())
+
+def sortCountries(countries, sortBy, top=None):
+  # One descending sort on the tuple of sortBy values orders rows exactly like
+  # successive stable sorts from the last key to the first, ties included.
+  # Without sortBy the rows are passed through lazily in upstream order.
+  if not sortBy:
+    return islice(countries, top)
+  if hasattr(countries, 'sortedRows'):
+    return countries.sortedRows(sortBy, top)
+  key = itemgetter(*sortBy)
+  if top is None:
+    return sorted(countries, key=key, reverse=True)
+  return heapq.nlargest(top, countries, key=key)
+
+def globalSummaryLine(globalCases):
+  return (f"Summary: global cases: {globalCases['TotalConfirmed']} "
+          f"(+{globalCases['NewConfirmed']}) confirmed, "
+          f"{globalCases['TotalDeaths']} (+{globalCases['NewDeaths']}) deaths")
+
+def printReport(globalCases, countries, keys=SUMMARY_KEYS, file=None, widths='grow'):
+  print(globalSummaryLine(globalCases), file=file)
+  print(file=file)
+
+  if iter(countries) is countries:
+    printTableStream(keys, countries, file=file, widths=widths)
+  else:
+    printTable(keys, countries, file=file)
+
+def printRegionSummary(countries, file=None):
+  from aggregate import aggregateCountries, printAggregates
+
+  metadata = getCountriesData([country['CountryCode'] for country in countries])
+  printAggregates(aggregateCountries(countries, metadata), file=file)
+
+def printGlobalSummary(sortBy=['TotalConfirmed', 'NewConfirmed'], enrich=False, stream=False,
+                       top=None, history=None, snapshot=None, fromSnapshot=False, regions=False,
+                       where=None, export=None, widths='grow', pager=False):
+  # With fromSnapshot the report is sorted and rendered straight off the
+  # memory-mapped snapshot; otherwise a given snapshot path is rewritten
+  # from the fetched summary for the next warm start. With export the
+  # sorted rows are written to that path (CSV or JSON Lines, gzipped for
+  # .gz, stdout for -) instead of being printed as a table. With pager they
+  # are shown in an interactive full-screen view instead. where is a filter
+  # expression or one compiled by compileWhere.
+  if isinstance(where, str):
+    where = compileWhere(where, enrich)
+  if fromSnapshot:
+    table = SnapshotTable(snapshot)
+    summary, countries = {'Global': table.globalCases}, table
+  elif stream:
+    summary = {}
+    countries = iterCountries(getCovidGlobalSummary(stream=True), summary)
+  else:
+    summary = getCovidGlobalSummary()
+    countries = summary['Countries']
+  recording = None
+  if history is not None and not fromSnapshot:
+    countries = recording = history.recording(countries)
+  if snapshot and not fromSnapshot:
+    countries = list(countries)
+    with profiler.span('snapshot'):
+      writeSnapshot(snapshot, summary['Global'], countries)
+  keys = list(EXPORT_KEYS if export else SUMMARY_KEYS)
+
+  if enrich:
+    countries = [dict(country) if fromSnapshot else country for country in countries]
+    with profiler.span('enrich'):
+      enrichGlobalSummary(countries)
+    keys += ENRICH_TYPES
+  if where:
+    countries = where.apply(countries)
+  if regions:
+    countries = list(countries) if not fromSnapshot else countries
+
+  with profiler.span('sort'):
+    rows = sortCountries(countries, sortBy, top)
+
+  with profiler.span('render'):
+    if export:
+      from export import Export
+      with Export(export, keys) as sink:
+        sink.writeAll(rows)
+    else:
+      if 'Global' not in summary:
+        # Streamed rows are still lazy here; read ahead until the global
+        # totals have been parsed so the report can start with them.
+        ahead = []
+        for row in rows:
+          ahead.append(row)
+          if 'Global' in summary:
+            break
+        else:
+          # top ran out of rows before totals sent after the countries.
+          for _ in countries:
+            pass
+        rows = chain(ahead, rows)
+      if pager:
+        from pager import page
+        rows = rows if hasattr(rows, '__getitem__') else list(rows)
+        page(keys, rows, globalSummaryLine(summary['Global']))
+      else:
+        printReport(summary['Global'], rows, keys, widths=widths)
+
+  if recording is not None:
+    # Unsorted rows cut off by top were never pulled through the recording,
+    # and it only commits once it has seen every row.
+    for _ in recording:
+      pass
+
+  if regions:
+    with profiler.span('regions'):
+      printRegionSummary(countries)
+
+  if fromSnapshot:
+    table.close()
 
 
 if __name__ == '__main__':
-  printGlobalSummary()
+  import argparse
+
+  parser = argparse.ArgumentParser(description='Print the global COVID-19 summary.')
+  parser.add_argument('--sort-by', nargs='*', default=['TotalConfirmed', 'NewConfirmed'],
+                      metavar='KEY',
+                      help='columns to sort by, most significant first; '
+                           'none prints rows as they arrive')
+  parser.add_argument('--pager', action='store_true',
+                      help='browse the table interactively (needs a terminal)')
+  parser.add_argument('--widths', choices=['grow', 'truncate', 'spill'], default='grow',
+                      help='how unsorted rows printed as they arrive get their column widths')
+  parser.add_argument('--top', type=int, metavar='N', help='only print the first N countries')
+  parser.add_argument('--enrich', action='store_true', help='add population and region columns')
+  parser.add_argument('--where', metavar='EXPR',
+                      help="only show matching countries, "
+                           "e.g. 'NewConfirmed > 1000 and TotalDeaths < 50000'")
+  parser.add_argument('--export', metavar='PATH',
+                      help='write the sorted rows to PATH instead: .csv or .jsonl, '
+                           'optionally .gz, - for stdout')
+  parser.add_argument('--json', nargs='?', const='', metavar='PATH',
+                      help='pretty-print the raw summary instead, '
+                           'or the part at a dotted PATH such as Countries.0')
+  parser.add_argument('--depth', type=int, metavar='N',
+                      help='with --json, elide objects and arrays nested deeper than N')
+  parser.add_argument('--regions', action='store_true',
+                      help='also print totals by region and subregion')
+  parser.add_argument('--stream', action='store_true',
+                      help='parse the summary incrementally while it downloads')
+  parser.add_argument('--retries', type=int, default=3,
+                      help='retries per request after a failure or 5xx')
+  parser.add_argument('--hedge', action='store_true',
+                      help='send a backup request when the first one is slow')
+  parser.add_argument('--rate-limit', type=float, default=10, metavar='N',
+                      help='requests per second allowed to each upstream host')
+  parser.add_argument('--history', metavar='DB',
+                      help='append the fetched summary to this SQLite history')
+  parser.add_argument('--snapshot', nargs='?', const=SNAPSHOT_PATH, metavar='PATH',
+                      help='write a binary snapshot of the fetched summary')
+  parser.add_argument('--from-snapshot', action='store_true',
+                      help='render from the snapshot instead of fetching, if there is one')
+  parser.add_argument('--profile', nargs='?', const='-', metavar='JSON',
+                      help='time each stage and print a breakdown to stderr, or write it to JSON')
+  parser.add_argument('--cache-dir', default=CACHE_DIR,
+                      help='directory of the summary response cache')
+  parser.add_argument('--cache-ttl', type=float, default=3600,
+                      help='seconds a cached summary is used without a request')
+  parser.add_argument('--no-cache', action='store_true', help='always download the summary')
+  parser.add_argument('--cache-stats', action='store_true',
+                      help='print cache hit/miss/revalidation counters')
+  args = parser.parse_args()
+  where = None
+  if args.where:
+    try:
+      where = compileWhere(args.where, args.enrich)
+    except ValueError as error:
+      parser.error(str(error))
+  unknown = [key for key in args.sort_by if key not in EXPORT_KEYS]
+  if unknown:
+    parser.error(f"unknown sort key {unknown[0]!r} (choose from {', '.join(EXPORT_KEYS)})")
+  if args.top is not None and args.top < 0:
+    parser.error('--top must not be negative')
+  if args.rate_limit <= 0:
+    parser.error('--rate-limit must be positive')
+
+  if args.profile:
+    profiler.enable()
+  limiter = RateLimiter(rate=args.rate_limit, burst=max(1, int(args.rate_limit)))
+  policy = RequestPolicy(retries=args.retries, hedge=args.hedge)
+  client = CovidClient(policy=policy, limiter=limiter)
+  snapshot = args.snapshot or (SNAPSHOT_PATH if args.from_snapshot else None)
+  fromSnapshot = args.from_snapshot and os.path.exists(snapshot)
+  if not args.no_cache and not fromSnapshot:
+    from httpcache import DiskCache
+    summaryCache = DiskCache(args.cache_dir, ttl=args.cache_ttl)
+
+  history = None
+  if args.history:
+    from history import HistoryStore
+    history = HistoryStore(args.history)
+  try:
+    if args.json is not None:
+      try:
+        printRawSummary(args.json, args.depth)
+      except KeyError as error:
+        parser.error(f'--json: the summary has no {error.args[0]!r}')
+    else:
+      printGlobalSummary(sortBy=args.sort_by, enrich=args.enrich, stream=args.stream,
+                         top=args.top, history=history, snapshot=snapshot,
+                         fromSnapshot=fromSnapshot, regions=args.regions, where=where,
+                         export=args.export, widths=args.widths,
+                         pager=args.pager and sys.stdout.isatty())
+  finally:
+    client.close()
+    if history is not None:
+      history.close()
+
+  if args.cache_stats and summaryCache:
+    print(f'Summary cache: {summaryCache.stats}', file=sys.stderr)
+  if args.profile:
+    print(f'Rate limiter: {limiter.stats()}', file=sys.stderr)
+
+  if args.profile == '-':
+    profiler.printReport()
+  elif args.profile:
+    profiler.writeJSON(args.profile)
@@ -0,0 +1,165 @@
+from itertools import chain
+
+from helper import cellText
+from textwidth import clip, displayWidth, padLeft
+
+class WidthIndex:
+  # Column widths over the rows shown so far. Rows are measured a block at a
+  # time the first time any row in the block is shown, so paging through a
+  # large table never stringifies rows away from the screen, and the columns
+  # only ever grow, without jumping back and forth while scrolling.
+  def __init__(self, keys, rows, blockSize=256):
+    self.keys = keys
+    self.rows = rows
+    self.blockSize = blockSize
+    self.measured = set()
+    self.widths = list(map(displayWidth, keys))
+
+  def cover(self, start, stop):
+    for block in range(start // self.blockSize, (stop - 1) // self.blockSize + 1):
+      if block not in self.measured:
+        self.measured.add(block)
+        for row in range(block * self.blockSize, min((block + 1) * self.blockSize, len(self.rows))):
+          self.widths = list(map(max, self.widths, map(displayWidth, self.cells(row))))
+    return self.widths
+
+  def cells(self, index):
+    row = self.rows[index]
+    return [cellText(row[key]) for key in self.keys]
+
+class TableView:
+  # The lines of a printTable layout for a window of rows, without the curses
+  # screen handling, so it can be driven and checked on its own.
+  def __init__(self, keys, rows, blockSize=256):
+    self.keys = keys
+    self.rows = rows
+    self.index = WidthIndex(keys, rows, blockSize)
+
+  def __len__(self):
+    return len(self.rows)
+
+  def lines(self, top, height):
+    stop = min(top + height, len(self.rows))
+    widths = self.index.cover(top, stop) if stop > top else self.index.widths
+    header = ' | '.join(map(padLeft, self.keys, widths))
+    rows = (' | '.join(map(padLeft, self.index.cells(row), widths)) for row in range(top, stop))
+    return list(chain([header, (sum(widths) + 3 * len(widths)) * '='], rows))
+
+  def search(self, text, start, backwards=False):
+    # Index of the next row at or after start (before, backwards) with a cell
+    # containing text, wrapping around once; None if there is none.
+    count = len(self.rows)
+    step = -1 if backwards else 1
+    for offset in range(count):
+      row = (start + step * offset) % count
+      if any(text in cell for cell in self.index.cells(row)):
+        return row
+    return None
+
+
+HELP = ('j/k: line  space/b: page  g/G: first/last  h/l: scroll  :N: go to row  /text: search  '
+        'n/N: next/previous  q: quit')
+
+def page(keys, rows, title=''):
+  # Shows rows in an interactive full-screen table. rows needs len() and
+  # indexing; only the rows on screen are formatted.
+  import curses
+
+  view = TableView(keys, rows)
+  curses.wrapper(Pager(view, title).run)
+
+class Pager:
+  def __init__(self, view, title=''):
+    self.view = view
+    self.title = title
+    self.top = 0
+    self.left = 0
+    self.query = None
+    self.message = HELP
+
+  def run(self, screen):
+    import curses
+
+    curses.curs_set(0)
+    while True:
+      height, width = screen.getmaxyx()
+      bodyHeight = max(height - 4, 1)
+      self.top = max(0, min(self.top, len(self.view) - bodyHeight))
+      self.draw(screen, bodyHeight, width)
+      key = screen.getch()
+      if key in (ord('q'), 27):
+        return
+      elif key in (ord('j'), curses.KEY_DOWN):
+        self.top += 1
+      elif key in (ord('k'), curses.KEY_UP):
+        self.top -= 1
+      elif key in (ord(' '), curses.KEY_NPAGE):
+        self.top += bodyHeight
+      elif key in (ord('b'), curses.KEY_PPAGE):
+        self.top -= bodyHeight
+      elif key in (ord('g'), curses.KEY_HOME):
+        self.top = 0
+      elif key in (ord('G'), curses.KEY_END):
+        self.top = len(self.view)
+      elif key in (ord('h'), curses.KEY_LEFT):
+        self.left = max(0, self.left - 8)
+      elif key in (ord('l'), curses.KEY_RIGHT):
+        self.left += 8
+      elif key == ord(':'):
+        self.goTo(self.prompt(screen, ':'))
+      elif key == ord('/'):
+        self.query = self.prompt(screen, '/') or self.query
+        self.find(self.top)
+      elif key == ord('n'):
+        self.find(self.top + 1)
+      elif key == ord('N'):
+        self.find(self.top - 1, backwards=True)
+      self.top = max(0, self.top)
+
+  def draw(self, screen, bodyHeight, width):
+    screen.erase()
+    lines = self.view.lines(self.top, bodyHeight)
+    status = f'rows {self.top + 1}-{min(self.top + bodyHeight, len(self.view))} of {len(self.view)}'
+    for y, line in enumerate([self.title, *lines[:2]]):
+      self.addLine(screen, y, line if y == 0 else line[self.left:], width)
+    for y, line in enumerate(lines[2:], 3):
+      self.addLine(screen, y, line[self.left:], width)
+    self.addLine(screen, bodyHeight + 3, f'{status}  {self.message}', width)
+    screen.refresh()
+
+  def addLine(self, screen, y, text, width):
+    # curses raises when writing the bottom-right cell, so leave it empty.
+    try:
+      screen.addstr(y, 0, clip(text, width - 1))
+    except Exception:
+      pass
+
+  def prompt(self, screen, prefix):
+    import curses
+
+    height, width = screen.getmaxyx()
+    self.addLine(screen, height - 1, prefix + ' ' * (width - 2), width)
+    curses.echo()
+    curses.curs_set(1)
+    try:
+      return screen.getstr(height - 1, len(prefix)).decode(errors='replace').strip()
+    finally:
+      curses.noecho()
+      curses.curs_set(0)
+
+  def goTo(self, text):
+    if text.isdigit() and int(text) > 0:
+      self.top = min(int(text), len(self.view)) - 1
+      self.message = HELP
+    else:
+      self.message = f'Not a row number: {text!r}'
+
+  def find(self, start, backwards=False):
+    if not self.query or not len(self.view):
+      return
+    row = self.view.search(self.query, start, backwards)
+    if row is None:
+      self.message = f'Not found: {self.query!r}'
+    else:
+      self.top = row
+      self.message = f'/{self.query}'
@@ -0,0 +1,149 @@
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class RequestPolicy:
+  # Retries failed requests with full-jitter exponential backoff while a
+  # retry budget lasts: every request earns retryBudget tokens, every retry
+  # spends one, so retries stay a bounded fraction of the traffic even when
+  # the upstream is down. The budget starts full and holds at most
+  # maxRetryTokens, which bounds a burst of retries. With hedging enabled a
+  # second copy of a request is sent once the first has been outstanding for
+  # longer than the observed hedgeQuantile latency of that endpoint, and
+  # whichever answers first wins. Latencies are sampled per endpoint (host
+  # and path up to its last segment) so that a slow bulk download does not
+  # delay the hedges of quick lookups. Hedged requests run on daemon threads:
+  # a losing request still on the wire must not hold up interpreter exit.
+  def __init__(self, retries=3, backoffBase=0.05, backoffCap=2.0, retryBudget=0.2,
+               maxRetryTokens=10, hedge=False, hedgeQuantile=0.95, hedgeDelay=0.5, minSamples=20,
+               maxWorkers=16, rng=None):
+    self.retries = retries
+    self.backoffBase = backoffBase
+    self.backoffCap = backoffCap
+    self.retryBudget = retryBudget
+    self.maxRetryTokens = maxRetryTokens
+    self.retryTokens = maxRetryTokens
+    self.hedge = hedge
+    self.hedgeQuantile = hedgeQuantile
+    self.defaultHedgeDelay = hedgeDelay
+    self.minSamples = minSamples
+    self.latencies = {}
+    self.random = rng or random.Random()
+    self.lock = threading.Lock()
+    self.workers = threading.BoundedSemaphore(maxWorkers)
+    self.stats = {'requests': 0, 'retries': 0, 'budgetExhausted': 0, 'hedges': 0, 'hedgeWins': 0}
+
+  def execute(self, send, url=None):
+    import requests
+
+    with self.lock:
+      self.stats['requests'] += 1
+      self.retryTokens = min(self.maxRetryTokens, self.retryTokens + self.retryBudget)
+
+    for attempt in range(self.retries + 1):
+      try:
+        key = endpoint(url)
+        res = self.hedged(send, key) if self.hedge else self.timed(send, key)
+      except (requests.ConnectionError, requests.Timeout):
+        if attempt == self.retries or not self.spendRetry():
+          raise
+      else:
+        retry = res.status_code in RETRY_STATUSES and attempt < self.retries
+        if not retry or not self.spendRetry():
+          return res
+        res.close()
+      time.sleep(self.backoff(attempt))
+
+  def spendRetry(self):
+    with self.lock:
+      if self.retryTokens < 1:
+        self.stats['budgetExhausted'] += 1
+        return False
+      self.retryTokens -= 1
+      self.stats['retries'] += 1
+      return True
+
+  def backoff(self, attempt):
+    return self.random.uniform(0, min(self.backoffCap, self.backoffBase * 2 ** attempt))
+
+  def timed(self, send, key=None):
+    start = time.perf_counter()
+    res = send()
+    with self.lock:
+      samples = self.latencies.setdefault(key, deque(maxlen=1000))
+    samples.append(time.perf_counter() - start)
+    return res
+
+  def hedgeDelay(self, key=None):
+    samples = sorted(self.latencies.get(key, ()))
+    if len(samples) < self.minSamples:
+      return self.defaultHedgeDelay
+    return samples[min(len(samples) - 1, int(self.hedgeQuantile * len(samples)))]
+
+  def submit(self, send, key):
+    # Like ThreadPoolExecutor.submit, with at most maxWorkers requests
+    # running at a time, but on a daemon thread of its own.
+    from concurrent.futures import Future
+
+    future = Future()
+
+    def run():
+      with self.workers:
+        if not future.set_running_or_notify_cancel():
+          return
+        try:
+          future.set_result(self.timed(send, key))
+        except BaseException as error:
+          future.set_exception(error)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+  def hedged(self, send, key=None):
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    primary = self.submit(send, key)
+    done, _ = wait([primary], timeout=self.hedgeDelay(key))
+    if done:
+      return primary.result()
+
+    with self.lock:
+      self.stats['hedges'] += 1
+    backup = self.submit(send, key)
+    pending = {primary, backup}
+    while True:
+      done, pending = wait(pending, return_when=FIRST_COMPLETED)
+      winner = next((f for f in done if f.exception() is None), None)
+      if winner is not None or not pending:
+        break
+    # A request that is already on the wire cannot be interrupted, so the
+    # loser is cancelled if it has not started yet and otherwise has its
+    # response closed as soon as it arrives.
+    for loser in {primary, backup} - {winner}:
+      if not loser.cancel():
+        loser.add_done_callback(closeResponse)
+    if winner is None:
+      return next(iter(done)).result()
+    if winner is backup:
+      with self.lock:
+        self.stats['hedgeWins'] += 1
+    return winner.result()
+
+  def close(self):
+    # Hedge threads are daemons that close their own losing responses, so
+    # there is nothing to shut down.
+    pass
+
+def endpoint(url):
+  if url is None:
+    return None
+  parts = urlsplit(url)
+  return parts.netloc, parts.path.rsplit('/', 1)[0] or parts.path
+
+def closeResponse(future):
+  if not future.cancelled() and future.exception() is None:
+    future.result().close()
@@ -0,0 +1,112 @@
+import sys
+import time
+from contextlib import nullcontext
+
+NULL_SPAN = nullcontext()
+
+class Span:
+  __slots__ = ('profiler', 'name', 'start', 'childTime', 'memoryStart', 'peak')
+
+  def __init__(self, profiler, name):
+    self.profiler = profiler
+    self.name = name
+
+  def __enter__(self):
+    self.childTime = 0
+    self.peak = 0
+    stack = self.profiler.stack
+    if self.profiler.allocations:
+      import tracemalloc
+
+      # The peak counter is shared, so before resetting it for this span the
+      # peak seen so far is handed to the enclosing span.
+      self.memoryStart, peak = tracemalloc.get_traced_memory()
+      if stack:
+        stack[-1].peak = max(stack[-1].peak, peak)
+      tracemalloc.reset_peak()
+    stack.append(self)
+    self.start = time.perf_counter()
+    return self
+
+  def __exit__(self, *exc):
+    elapsed = time.perf_counter() - self.start
+    profiler = self.profiler
+    profiler.stack.pop()
+    parent = profiler.stack[-1] if profiler.stack else None
+    stage = profiler.stages.setdefault(
+      self.name, {'calls': 0, 'total': 0.0, 'self': 0.0, 'allocated': 0, 'peak': 0})
+    stage['calls'] += 1
+    stage['total'] += elapsed
+    stage['self'] += elapsed - self.childTime
+    if parent is not None:
+      parent.childTime += elapsed
+    if profiler.allocations:
+      import tracemalloc
+
+      current, peak = tracemalloc.get_traced_memory()
+      peak = max(peak, self.peak)
+      stage['allocated'] += current - self.memoryStart
+      stage['peak'] = max(stage['peak'], peak - self.memoryStart)
+      if parent is not None:
+        parent.peak = max(parent.peak, peak)
+
+class Profiler:
+  # Collects wall time per named stage. Spans nest; each stage reports its
+  # inclusive time and its self time without nested spans, so for example
+  # a streamed download consumed inside 'sort' is charged to 'fetch' and
+  # 'decode' rather than to sorting. While disabled, span() returns a
+  # shared no-op context manager.
+  def __init__(self):
+    self.enabled = False
+    self.allocations = False
+    self.stages = {}
+    self.stack = []
+
+  def enable(self, allocations=True):
+    self.enabled = True
+    self.allocations = allocations
+    import tracemalloc
+
+    if allocations and not tracemalloc.is_tracing():
+      tracemalloc.start()
+
+  def span(self, name):
+    return Span(self, name) if self.enabled else NULL_SPAN
+
+  def iterate(self, name, iterable):
+    # Charges the time spent producing each item of iterable to name.
+    if not self.enabled:
+      return iterable
+    return self.timedIter(name, iter(iterable))
+
+  def timedIter(self, name, iterator):
+    while True:
+      with self.span(name):
+        item = next(iterator, NULL_SPAN)
+      if item is NULL_SPAN:
+        return
+      yield item
+
+  def report(self):
+    return {name: dict(stage, total=round(stage['total'], 6), self=round(stage['self'], 6))
+            for name, stage in self.stages.items()}
+
+  def printReport(self, file=None):
+    file = file or sys.stderr
+    total = sum(stage['self'] for stage in self.stages.values()) or 1
+    print(f"{'stage':>10} | {'calls':>6} | {'self ms':>9} | {'share':>6} | {'total ms':>9} | "
+          f"{'alloc KiB':>10} | {'peak KiB':>9}", file=file)
+    for name, stage in sorted(self.stages.items(), key=lambda item: item[1]['self'], reverse=True):
+      print(f"{name:>10} | {stage['calls']:>6} | {stage['self'] * 1e3:>9.2f} | "
+            f"{stage['self'] / total:>6.1%} | {stage['total'] * 1e3:>9.2f} | "
+            f"{stage['allocated'] / 1024:>10.1f} | {stage['peak'] / 1024:>9.1f}",
+            file=file)
+
+  def writeJSON(self, path):
+    import json
+
+    with open(path, 'w') as f:
+      json.dump({'timestamp': time.time(), 'stages': self.report()}, f, indent=2, sort_keys=True)
+
+
+profiler = Profiler()
@@ -0,0 +1,113 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+class TokenBucket:
+  # tokens is the balance at time updated. Taking a token never blocks
+  # while holding the lock: the balance may go negative and the caller is
+  # told how long to wait until its token has been refilled, so threads and
+  # asyncio tasks can each sleep their own way and are served in order.
+  def __init__(self, rate, capacity, clock=time.monotonic):
+    if rate <= 0:
+      raise ValueError(f'rate must be positive, got {rate}')
+    self.rate = rate
+    self.capacity = capacity
+    self.clock = clock
+    self.tokens = capacity
+    self.updated = clock()
+    self.lock = threading.Lock()
+    self.stats = {'acquired': 0, 'waited': 0, 'totalWait': 0.0, 'maxWait': 0.0, 'pauses': 0}
+
+  def refill(self, now):
+    if now > self.updated:
+      self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+      self.updated = now
+
+  def reserve(self):
+    with self.lock:
+      now = self.clock()
+      self.refill(now)
+      self.tokens -= 1
+      wait = max(0.0, self.updated + max(0.0, -self.tokens) / self.rate - now)
+      stats = self.stats
+      stats['acquired'] += 1
+      if wait > 0:
+        stats['waited'] += 1
+        stats['totalWait'] += wait
+        stats['maxWait'] = max(stats['maxWait'], wait)
+      return wait
+
+  def acquire(self):
+    wait = self.reserve()
+    if wait > 0:
+      time.sleep(wait)
+
+  async def acquireAsync(self):
+    import asyncio
+
+    wait = self.reserve()
+    if wait > 0:
+      await asyncio.sleep(wait)
+
+  def pause(self, seconds):
+    # Stops refilling for seconds and drops any saved-up burst, so nobody
+    # gets a token before the upstream said it would accept requests again.
+    with self.lock:
+      now = self.clock()
+      self.refill(now)
+      self.stats['pauses'] += 1
+      if now + seconds > self.updated:
+        self.updated = now + seconds
+        self.tokens = min(self.tokens, 0)
+
+class RateLimiter:
+  # One token bucket per host, created on first use. limits maps a host to
+  # (requests per second, burst); other hosts get the default.
+  def __init__(self, rate=10, burst=10, limits=None, clock=time.monotonic):
+    self.default = (rate, burst)
+    self.limits = dict(limits or {})
+    # Checked up front rather than when a host's bucket is first created.
+    for hostRate, _ in [self.default, *self.limits.values()]:
+      if hostRate <= 0:
+        raise ValueError(f'rate must be positive, got {hostRate}')
+    self.clock = clock
+    self.buckets = {}
+    self.lock = threading.Lock()
+
+  def bucket(self, url):
+    host = urlsplit(url).netloc or url
+    bucket = self.buckets.get(host)
+    if bucket is None:
+      with self.lock:
+        bucket = self.buckets.get(host)
+        if bucket is None:
+          rate, burst = self.limits.get(host, self.default)
+          bucket = self.buckets[host] = TokenBucket(rate, burst, self.clock)
+    return bucket
+
+  def acquire(self, url):
+    self.bucket(url).acquire()
+
+  async def acquireAsync(self, url):
+    await self.bucket(url).acquireAsync()
+
+  def pause(self, url, seconds):
+    self.bucket(url).pause(seconds)
+
+  def stats(self):
+    return {host: dict(bucket.stats) for host, bucket in self.buckets.items()}
+
+def retryAfterSeconds(value):
+  # Retry-After is either a number of seconds or an HTTP date.
+  if value is None:
+    return None
+  try:
+    return max(0.0, float(value))
+  except ValueError:
+    pass
+  from email.utils import parsedate_to_datetime
+
+  try:
+    return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+  except (TypeError, ValueError):
+    return None
@@ -0,0 +1,107 @@
+import mmap
+import os
+import struct
+from array import array
+
+from columns import NUMERIC_KEYS, STRING_KEYS, ColumnTable, CountryTable
+
+# Layout, all little-endian and 8-byte aligned between sections:
+#   header        magic, version, rows, numeric key count, string key count, string count
+#   key names     u16 length + utf-8 bytes per key, numeric keys first
+#   global        one int64 per numeric key
+#   numeric       one int64 column of `rows` values per numeric key
+#   string codes  one uint32 column of `rows` values per string key
+#   string table  (string count + 1) uint32 offsets into the utf-8 blob that follows
+MAGIC = b'CVSN'
+VERSION = 1
+HEADER = struct.Struct('<4sIIIII')
+
+def align(offset):
+  return (offset + 7) & ~7
+
+def writeSnapshot(path, globalCases, countries, numericKeys=NUMERIC_KEYS, stringKeys=STRING_KEYS):
+  table = countries if isinstance(countries, CountryTable) else \
+    CountryTable.fromRows(countries, numericKeys=numericKeys, stringKeys=stringKeys)
+  numericKeys, stringKeys = list(table.numeric), list(table.codes)
+  encoded = [string.encode() for string in table.strings]
+  offsets = array('I', [0])
+  for data in encoded:
+    offsets.append(offsets[-1] + len(data))
+
+  head = [HEADER.pack(MAGIC, VERSION, len(table), len(numericKeys), len(stringKeys), len(encoded))]
+  for key in numericKeys + stringKeys:
+    name = key.encode()
+    head.append(struct.pack('<H', len(name)) + name)
+  head = b''.join(head)
+  # Padding the header puts every int64 section on an 8-byte boundary and
+  # the uint32 sections after them on 4-byte ones, so all of them can be
+  # cast in place when mapped.
+  head += b'\0' * (align(len(head)) - len(head))
+
+  os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+  tmpPath = f'{path}.{os.getpid()}.tmp'
+  with open(tmpPath, 'wb') as f:
+    f.write(head)
+    f.write(array('q', [globalCases.get(key, 0) for key in numericKeys]).tobytes())
+    for key in numericKeys:
+      f.write(table.numeric[key].tobytes())
+    for key in stringKeys:
+      f.write(table.codes[key].tobytes())
+    f.write(offsets.tobytes())
+    f.writelines(encoded)
+  os.replace(tmpPath, path)
+
+class SnapshotTable(ColumnTable):
+  # Read-only view of a snapshot file. Numeric columns are memoryviews cast
+  # straight over the mapping and strings are decoded only when a cell is
+  # read, so opening a snapshot costs the same regardless of its size.
+  def __init__(self, path):
+    with open(path, 'rb') as f:
+      self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    buffer = self.buffer = memoryview(self.map)
+    magic, version, rows, numNumeric, numString, numStrings = HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION:
+      raise ValueError(f'{path} is not a version {VERSION} summary snapshot')
+
+    offset = HEADER.size
+    names = []
+    for _ in range(numNumeric + numString):
+      length, = struct.unpack_from('<H', buffer, offset)
+      names.append(bytes(buffer[offset + 2:offset + 2 + length]).decode())
+      offset += 2 + length
+    numericKeys, stringKeys = names[:numNumeric], names[numNumeric:]
+    offset = align(offset)
+
+    def take(size, format):
+      nonlocal offset
+      view = buffer[offset:offset + size * struct.calcsize(format)].cast(format)
+      offset += size * struct.calcsize(format)
+      return view
+
+    self.length = rows
+    self.keys = stringKeys + numericKeys
+    self.globalCases = dict(zip(numericKeys, take(numNumeric, 'q').tolist()))
+    self.numeric = {key: take(rows, 'q') for key in numericKeys}
+    self.codes = {key: take(rows, 'I') for key in stringKeys}
+    self.offsets = take(numStrings + 1, 'I')
+    self.blob = buffer[offset:]
+
+  def string(self, code):
+    return str(self.blob[self.offsets[code]:self.offsets[code + 1]], 'utf-8')
+
+  def value(self, key, index):
+    column = self.numeric.get(key)
+    if column is not None:
+      return column[index]
+    return self.string(self.codes[key][index])
+
+  def column(self, key):
+    if key in self.numeric:
+      return self.numeric[key]
+    return [self.string(code) for code in self.codes[key]]
+
+  def close(self):
+    views = [*self.numeric.values(), *self.codes.values(), self.offsets, self.blob, self.buffer]
+    for view in views:
+      view.release()
+    self.map.close()
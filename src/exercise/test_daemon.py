@@ -0,0 +1,57 @@
+"""Report server query validation and request counters."""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from daemon import ReportServer, SummaryService
+from fakeserver import syntheticSummary
+
+
+@pytest.fixture(name='base_url')
+def fixture_base_url():
+    """A report server over a fixed synthetic summary."""
+    service = SummaryService(fetch=lambda: syntheticSummary(20))
+    server = ReportServer(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def status(url):
+    """HTTP status of a GET request to url."""
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status
+    except urllib.error.HTTPError as error:
+        return error.code
+
+
+def test_query_validation(base_url):
+    """Bad top and sortBy values get a 400 instead of a dropped connection."""
+    assert status(f'{base_url}/summary?top=3') == 200
+    assert status(f'{base_url}/summary?top=0&sortBy=NewDeaths') == 200
+    for query in ('top=abc', 'top=-1', 'top=1.5', 'top=%C2%B2', 'sortBy=Bogus',
+                  'sortBy=NewDeaths,NewDeaths'):
+        assert status(f'{base_url}/summary?{query}') == 400
+
+
+def test_stats_count_every_request(base_url):
+    """Concurrent requests are all counted, and /stats reports them as JSON."""
+    def fetch_many():
+        for _ in range(25):
+            assert status(f'{base_url}/summary') == 200
+
+    threads = [threading.Thread(target=fetch_many) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with urllib.request.urlopen(f'{base_url}/stats') as response:
+        stats = json.load(response)
+    assert stats['requests'] == 200
+    assert stats['upstreamCalls'] >= 1
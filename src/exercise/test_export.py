@@ -0,0 +1,66 @@
+"""Exports: reproducible bytes, stdout left usable, and missing values."""
+
+import csv
+import gzip
+import io
+import json
+import sys
+
+import pytest
+
+from export import Export
+
+KEYS = ['Country', 'NewConfirmed', 'Population']
+ROWS = [
+    {'Country': 'Côte d’Ivoire', 'NewConfirmed': 12, 'Population': 26000000},
+    {'Country': 'Quoted, "name"', 'NewConfirmed': 0, 'Population': None},
+]
+
+
+def export_bytes(path):
+    """Writes ROWS to path and returns the file's bytes."""
+    with Export(str(path), KEYS) as sink:
+        sink.writeAll(ROWS)
+    assert sink.count == len(ROWS)
+    return path.read_bytes()
+
+
+@pytest.mark.parametrize('name', ['rows.csv', 'rows.jsonl', 'rows.csv.gz', 'rows.ndjson.gz'])
+def test_output_is_reproducible(tmp_path, name):
+    """Two exports of the same rows are byte-identical, gzip header included."""
+    first = export_bytes(tmp_path / f'first-{name}')
+    second = export_bytes(tmp_path / f'second-{name}')
+    assert first == second
+    if name.endswith('.gz'):
+        assert first[4:8] == b'\0\0\0\0'
+        assert gzip.decompress(first) == export_bytes(tmp_path / name[:-3])
+
+
+def test_missing_values(tmp_path):
+    """None is an empty CSV field and a JSON null."""
+    text = export_bytes(tmp_path / 'rows.csv').decode()
+    assert list(csv.reader(io.StringIO(text))) == [
+        KEYS, ['Côte d’Ivoire', '12', '26000000'], ['Quoted, "name"', '0', '']]
+
+    lines = export_bytes(tmp_path / 'rows.jsonl').decode().splitlines()
+    assert [json.loads(line) for line in lines] == ROWS
+    assert lines[1].endswith('"Population":null}')
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_stdout_stays_open(monkeypatch, compress):
+    """Exporting to '-' flushes stdout but leaves it open for later output."""
+    stdout = io.TextIOWrapper(io.BytesIO(), encoding='utf-8')
+    monkeypatch.setattr(sys, 'stdout', stdout)
+    with Export('-', KEYS, format='jsonl', compress=compress) as sink:
+        sink.writeAll(ROWS)
+    print('done')
+    stdout.flush()
+
+    data = stdout.buffer.getvalue()
+    if compress:
+        body, tail = data[:-len('done\n')], data[-len('done\n'):]
+        assert tail == b'done\n'
+        data = gzip.decompress(body) + tail
+    assert [json.loads(line) for line in data.decode().splitlines()[:-1]] == ROWS
+    assert data.endswith(b'}\ndone\n')
@@ -0,0 +1,119 @@
+"""Filter expressions: parsing, errors, type checks and rows with missing values."""
+
+import io
+import subprocess
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import pytest
+
+import main
+from columns import CountryTable
+from fakeserver import FakeApiServer, syntheticSummary
+from filterexpr import compileFilter
+from lrucache import LRUCache
+
+FIELD_TYPES = {'Country': str, 'NewConfirmed': int, 'TotalDeaths': int, 'Population': int}
+ROWS = [
+    {'Country': 'Germany', 'NewConfirmed': 1500, 'TotalDeaths': 9000, 'Population': 83000000},
+    {'Country': 'France', 'NewConfirmed': 500, 'TotalDeaths': 29000, 'Population': None},
+    {'Country': 'Iceland', 'NewConfirmed': 0, 'TotalDeaths': 10, 'Population': 360000},
+]
+
+
+@pytest.mark.parametrize('expression, expected', [
+    ('NewConfirmed > 1000', ['Germany']),
+    ('NewConfirmed >= 500 and TotalDeaths < 10000', ['Germany']),
+    ('not (Country == "Germany" or Country = \'France\')', ['Iceland']),
+    ('NewConfirmed > 100 or TotalDeaths < 100 and Country != "Iceland"', ['Germany', 'France']),
+    ('TotalDeaths > 1e4', ['France']),
+    ('NewConfirmed > -1.5', ['Germany', 'France', 'Iceland']),
+    ('NewConfirmed', ['Germany', 'France']),
+])
+def test_matching_rows(expression, expected):
+    """Precedence, keywords, = for == and number forms evaluate like Python."""
+    row_filter = compileFilter(expression, FIELD_TYPES)
+    assert [row['Country'] for row in row_filter.apply(ROWS)] == expected
+
+
+@pytest.mark.parametrize('expression, message', [
+    ('NewConfirmed >', 'Unexpected'),
+    ('(NewConfirmed > 1', "Expected ')'"),
+    ('NewConfirmed > 1 1', 'Expected end of input'),
+    ('NewConfirmed ! 1', "Unexpected character '!'"),
+    ("Country == 'Germany", "Unexpected character \"'\""),
+    ('Foo > 1', "Unknown field 'Foo'"),
+    ('Country > 1', 'Cannot compare Country (text) with 1 (number)'),
+    ('NewConfirmed == "1"', "Cannot compare NewConfirmed (number) with '1' (text)"),
+    ('Country < NewConfirmed', 'Cannot compare Country (text) with NewConfirmed (number)'),
+])
+def test_invalid_filters(expression, message):
+    """Syntax errors, unknown fields and text/number comparisons are ValueErrors."""
+    with pytest.raises(ValueError, match=message.replace('(', r'\(').replace(')', r'\)')):
+        compileFilter(expression, FIELD_TYPES)
+
+
+def test_nullable_fields_never_order():
+    """A None in a nullable field fails ordering comparisons instead of raising."""
+    row_filter = compileFilter('Population > 1000000 or Population < 1000000', FIELD_TYPES,
+                               ['Population'])
+    assert [row['Country'] for row in row_filter.apply(ROWS)] == ['Germany', 'Iceland']
+    row_filter = compileFilter('Population != 360000', FIELD_TYPES, ['Population'])
+    assert [row['Country'] for row in row_filter.apply(ROWS)] == ['Germany', 'France']
+    with pytest.raises(TypeError):
+        list(compileFilter('Population > 1000000', FIELD_TYPES).apply(ROWS))
+
+
+def test_column_store_matches_rows():
+    """Column-wise selection on a column store picks the same rows as the row predicate."""
+    countries = syntheticSummary(200)['Countries']
+    table = CountryTable.fromRows(countries)
+    for expression in ('NewConfirmed > 500 and TotalDeaths < 40000', 'Slug == "country-7"', '1'):
+        row_filter = main.compileWhere(expression)
+        assert [row['Country'] for row in row_filter.apply(table)] == \
+            [row['Country'] for row in row_filter.apply(countries)]
+
+
+def test_enriched_filter_skips_unknown_countries(monkeypatch):
+    """Countries without metadata have no population and do not match a population filter."""
+    with FakeApiServer(numCountries=10, unknownCodes=('AB', 'AC')) as api:
+        client = main.CovidClient(countriesApi=api.url, covidApi=api.url)
+        monkeypatch.setattr(main, 'client', client)
+        monkeypatch.setattr(main, 'summaryCache', None)
+        monkeypatch.setattr(main, 'countryCache', LRUCache(maxSize=512))
+        output = io.StringIO()
+        with redirect_stdout(output):
+            main.printGlobalSummary(sortBy=[], enrich=True, where='Population > 1000000')
+    printed = output.getvalue()
+    assert 'Country 0 ' in printed and 'Country 3 ' in printed
+    assert 'Country 1 ' not in printed and 'Country 2 ' not in printed
+
+
+@pytest.mark.parametrize('where', ['Foo > 1', 'NewConfirmed >', 'Country > 1', 'Population > 1'])
+def test_cli_rejects_bad_filter(where):
+    """main.py reports a bad --where as a usage error before fetching anything."""
+    result = subprocess.run([sys.executable, 'main.py', '--where', where, '--no-cache'],
+                            cwd=Path(__file__).parent, capture_output=True, text=True, timeout=30,
+                            check=False)
+    assert result.returncode == 2
+    assert 'error: ' in result.stderr and 'Traceback' not in result.stderr
+
+
+@pytest.mark.parametrize('sort_by', [[], ['NewConfirmed']])
+def test_missing_enrichment_prints_blank(monkeypatch, sort_by):
+    """Countries without metadata get blank Population and Region cells, not 'None'."""
+    with FakeApiServer(numCountries=5, unknownCodes=('AC',)) as api:
+        client = main.CovidClient(countriesApi=api.url, covidApi=api.url)
+        monkeypatch.setattr(main, 'client', client)
+        monkeypatch.setattr(main, 'summaryCache', None)
+        monkeypatch.setattr(main, 'countryCache', LRUCache(maxSize=512))
+        output = io.StringIO()
+        with redirect_stdout(output):
+            main.printGlobalSummary(sortBy=sort_by, enrich=True, stream=not sort_by)
+    lines = output.getvalue().splitlines()
+    assert 'None' not in output.getvalue()
+    unknown = next(line for line in lines if 'Country 2 ' in line)
+    assert [cell.strip() for cell in unknown.split('|')][-2:] == ['', '']
+    known = next(line for line in lines if 'Country 3 ' in line)
+    assert all(cell.strip() for cell in known.split('|'))
@@ -0,0 +1,70 @@
+"""Tables printed from a list and streamed from an iterator, by display width."""
+
+import io
+
+import pytest
+
+from helper import printTable, printTableStream
+from textwidth import displayWidth
+
+KEYS = ['Country', 'NewConfirmed']
+ROWS = [
+    {'Country': 'Chad', 'NewConfirmed': 3},
+    {'Country': 'Peru', 'NewConfirmed': 120},
+    {'Country': '日本', 'NewConfirmed': 45},
+    {'Country': 'Cote\u0302 d’Ivoire', 'NewConfirmed': 7},
+    {'Country': 'United Kingdom of Great Britain', 'NewConfirmed': 1234567},
+    {'Country': '中华人民共和国', 'NewConfirmed': 8},
+]
+
+
+def render(print_table, *args, **kwargs):
+    """The text print_table writes for args."""
+    output = io.StringIO()
+    print_table(*args, file=output, **kwargs)
+    return output.getvalue()
+
+
+def cell_widths(line):
+    """Display widths of the padded cells on one table line."""
+    return [displayWidth(cell) for cell in line.split(' | ')]
+
+
+@pytest.mark.parametrize('sample_size', [1, 2, 1000])
+def test_spill_matches_print_table(sample_size):
+    """'spill' prints exactly what printTable prints, whatever the sample size."""
+    expected = render(printTable, KEYS, ROWS)
+    assert render(printTableStream, KEYS, iter(ROWS), widths='spill',
+                  sampleSize=sample_size) == expected
+    assert render(printTableStream, KEYS, iter(ROWS), widths='grow') == expected
+    assert render(printTableStream, ['Country'], iter([]), widths='spill') == \
+        render(printTable, ['Country'], [])
+
+
+def test_truncate_keeps_sampled_widths():
+    """Cells wider than the sampled column are clipped with '…' inside its width."""
+    lines = render(printTableStream, KEYS, iter(ROWS), widths='truncate',
+                   sampleSize=2).splitlines()
+    header_widths = cell_widths(lines[0])
+    assert header_widths == [7, 12]
+    for line in lines[2:]:
+        assert cell_widths(line) == header_widths
+    assert lines[5].split(' | ')[0] == 'Cote\u0302 d…'
+    assert lines[6].split(' | ')[0] == 'United…'
+    assert lines[7].split(' | ')[0] == '中华人…'
+
+
+def test_grow_widens_columns():
+    """A wider cell widens its column from that line on, never back."""
+    lines = render(printTableStream, KEYS, iter(ROWS), widths='grow', sampleSize=2).splitlines()
+    widths = [cell_widths(line) for line in lines[2:]]
+    assert widths[0] == widths[1] == widths[2] == [7, 12]
+    assert widths[3] == [13, 12]
+    assert widths[4] == widths[5] == [31, 12]
+    assert 'United Kingdom of Great Britain' in lines[6]
+
+
+def test_unknown_width_strategy():
+    """Only grow, truncate and spill are accepted."""
+    with pytest.raises(ValueError, match='Unknown width strategy'):
+        printTableStream(KEYS, iter(ROWS), widths='wrap')
@@ -0,0 +1,97 @@
+"""History recording: rows stored even when the report stops early, windows and growth."""
+
+import io
+import sqlite3
+from contextlib import redirect_stdout
+
+import pytest
+
+import main
+from fakeserver import FakeApiServer
+from history import HistoryStore
+
+
+def count_rows(path):
+    """Number of snapshots committed to the history at path."""
+    with sqlite3.connect(path) as db:
+        return db.execute('SELECT COUNT(*) FROM snapshots').fetchone()[0]
+
+
+def test_recording_commits_only_when_drained(tmp_path):
+    """A recording closed early rolls back; record() stores every row."""
+    path = str(tmp_path / 'history.db')
+    rows = [{'CountryCode': f'C{i}', 'Date': '2020-06-01T00:00:00Z', 'NewConfirmed': i,
+             'TotalConfirmed': i, 'NewDeaths': 0, 'TotalDeaths': 0} for i in range(10)]
+
+    store = HistoryStore(path)
+    recording = store.recording(rows)
+    next(recording)
+    recording.close()
+    assert count_rows(path) == 0
+
+    store.record(rows)
+    store.close()
+    assert count_rows(path) == 10
+
+
+def test_unsorted_top_records_every_country(tmp_path, monkeypatch):
+    """With no sort keys the rows stay lazy, but the history still gets all of them."""
+    with FakeApiServer(numCountries=50) as api:
+        monkeypatch.setattr(main, 'client', main.CovidClient(covidApi=api.url))
+        monkeypatch.setattr(main, 'summaryCache', None)
+        for stream in (False, True):
+            path = str(tmp_path / f'history-{stream}.db')
+            store = HistoryStore(path)
+            output = io.StringIO()
+            with redirect_stdout(output):
+                main.printGlobalSummary(sortBy=[], top=3, stream=stream, history=store)
+            store.close()
+            assert len(output.getvalue().splitlines()) == 4 + 3
+            assert count_rows(path) == 50
+
+
+def snapshot(day, new_confirmed, total_confirmed, new_deaths=0):
+    """A summary row for country DE on 2020-06-<day>."""
+    return {'CountryCode': 'DE', 'Date': f'2020-06-{day:02d}T00:00:00Z',
+            'NewConfirmed': new_confirmed, 'TotalConfirmed': total_confirmed,
+            'NewDeaths': new_deaths, 'TotalDeaths': 0}
+
+
+def test_window_covers_calendar_days(tmp_path):
+    """The rolling window matches a direct sum over the last seven dates, gaps included."""
+    days = [1, 2, 3, 5, 6, 9, 10, 11, 12, 20, 21, 22, 23, 24, 25, 26, 27, 28]
+    rows = [snapshot(day, 10 * day, 1000 + day, day % 3) for day in days]
+    store = HistoryStore(str(tmp_path / 'history.db'), window=7)
+    store.record(rows)
+
+    history = store.lastDays('DE', 30)
+    assert [row['date'] for row in history] == [f'2020-06-{day:02d}' for day in days]
+    for day, recorded in zip(days, history):
+        inside = [row for other, row in zip(days, rows) if day - 7 < other <= day]
+        assert recorded['avgNewConfirmed'] == \
+            sum(row['NewConfirmed'] for row in inside) / len(inside)
+        assert recorded['avgNewDeaths'] == sum(row['NewDeaths'] for row in inside) / len(inside)
+    store.close()
+
+
+def test_growth_rate_is_daily(tmp_path):
+    """Growth is per day however many days separate two snapshots."""
+    store = HistoryStore(str(tmp_path / 'history.db'))
+    store.record([snapshot(1, 0, 1000), snapshot(2, 100, 1100), snapshot(4, 0, 1331)])
+    rates = [row['growthRate'] for row in store.lastDays('DE', 7)]
+    assert rates[0] is None
+    assert rates[1] == pytest.approx(0.1) and rates[2] == pytest.approx(0.1)
+    store.close()
+
+
+def test_rerun_replaces_the_latest_day(tmp_path):
+    """A second run on the same date updates that row; an older date is ignored."""
+    store = HistoryStore(str(tmp_path / 'history.db'))
+    store.record([snapshot(1, 10, 100), snapshot(2, 20, 120)])
+    store.record([snapshot(2, 30, 130)])
+    store.record([snapshot(1, 99, 999)])
+    history = store.lastDays('DE', 7)
+    assert [(row['date'], row['newConfirmed']) for row in history] == \
+        [('2020-06-01', 10), ('2020-06-02', 30)]
+    assert history[1]['avgNewConfirmed'] == 20 and history[1]['growthRate'] == pytest.approx(0.3)
+    store.close()
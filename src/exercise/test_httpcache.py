@@ -0,0 +1,90 @@
+"""Summary disk cache: fresh hits, 304 revalidation, misses and streamed stores."""
+
+import json
+import os
+
+import pytest
+
+from client import CovidClient
+from fakeserver import FakeApiServer
+from httpcache import DiskCache
+
+
+@pytest.fixture(name='api')
+def fixture_api():
+    """A fake API server for the duration of one test."""
+    with FakeApiServer(numCountries=20) as server:
+        yield server
+
+
+def summary_requests(api):
+    """Number of /summary requests the server has answered."""
+    return api.requests.get('/summary', 0)
+
+
+def test_fresh_hit_makes_no_request(tmp_path, api):
+    """Within the TTL the stored body is used without asking the server."""
+    cache = DiskCache(str(tmp_path), ttl=3600)
+    client = CovidClient(covidApi=api.url)
+    url = f'{api.url}/summary'
+
+    first = client.getJSON(url, cache=cache)
+    assert client.getJSON(url, cache=cache) == first == api.summary
+    assert summary_requests(api) == 1
+    assert cache.stats == {'hits': 1, 'misses': 1, 'revalidations': 0}
+
+    # A new cache over the same directory finds the entry on disk.
+    cache = DiskCache(str(tmp_path), ttl=3600)
+    assert b''.join(client.iterContent(url, cache=cache)) == api.summaryBody
+    assert summary_requests(api) == 1
+    assert cache.stats['hits'] == 1
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_stale_entry_is_revalidated(tmp_path, api, stream):
+    """Past the TTL the ETag is sent, and a 304 reuses the stored body."""
+    cache = DiskCache(str(tmp_path), ttl=0)
+    client = CovidClient(covidApi=api.url)
+    url = f'{api.url}/summary'
+
+    for _ in range(3):
+        if stream:
+            body = json.loads(b''.join(client.iterContent(url, cache=cache)))
+        else:
+            body = client.getJSON(url, cache=cache)
+        assert body == api.summary
+    assert summary_requests(api) == 3
+    assert cache.stats == {'hits': 0, 'misses': 1, 'revalidations': 2}
+
+
+def test_changed_etag_is_a_miss(tmp_path, api):
+    """A body the server has replaced is downloaded and stored again."""
+    cache = DiskCache(str(tmp_path), ttl=0)
+    client = CovidClient(covidApi=api.url)
+    url = f'{api.url}/summary'
+    client.getJSON(url, cache=cache)
+
+    api.summaryBody = b'{"Global": {}, "Countries": []}'
+    api.summaryETag = '"changed"'
+    assert client.getJSON(url, cache=cache) == {'Global': {}, 'Countries': []}
+    assert cache.stats == {'hits': 0, 'misses': 2, 'revalidations': 0}
+    assert cache.load(url)['etag'] == '"changed"'
+
+
+def test_store_stream_early_close_leaves_nothing(tmp_path):
+    """A body that is not read to the end is neither cached nor left as a temporary file."""
+    cache = DiskCache(str(tmp_path))
+    url = 'http://example.invalid/summary'
+
+    body = [b'{"a": ', b'1}']
+    chunks = cache.storeStream(url, iter(body), {'ETag': '"x"'})
+    assert next(chunks) == b'{"a": '
+    chunks.close()
+    assert cache.load(url) is None
+    assert os.listdir(str(tmp_path)) == []
+
+    assert b''.join(cache.storeStream(url, iter(body), {'ETag': '"x"'})) == b'{"a": 1}'
+    meta = cache.load(url)
+    assert meta['etag'] == '"x"'
+    assert cache.readJSON(meta) == {'a': 1}
+    assert sorted(name.rsplit('.', 1)[1] for name in os.listdir(str(tmp_path))) == ['body', 'json']
@@ -0,0 +1,127 @@
+"""Incremental JSON parsing with values split across arbitrary chunk boundaries."""
+
+import io
+import json
+from contextlib import redirect_stdout
+
+import pytest
+
+import main
+from fakeserver import FakeApiServer, syntheticSummary
+from helper import prettyPrintJSON, prettyPrintJSONStream
+from jsonstream import JSONStream, iterSummary
+
+DOCUMENT = {
+    'numbers': [0, -3, 1.25, 1.5e10, 2e-3, -0.5, 12345678901234567890, 1e+100],
+    'nested': {'empty': {}, 'list': [], 'deep': [[1, [2, {'x': None}]], True, False]},
+    'text': ['café', '中国', 'quote " and \\ backslash', '\U0001F600'],
+    'Total': 1.5,
+    'byYear': {'2020': [1, 2], '2021': {'7': 'July'}},
+}
+
+
+def chunked(data, size):
+    """data in pieces of size bytes, so multi-byte characters and numbers get split."""
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize('size', range(1, 8))
+def test_values_split_across_chunks(size):
+    """Top-level members, array items and skipped values come out as json.loads sees them."""
+    data = json.dumps(DOCUMENT).encode()
+
+    stream = JSONStream(chunked(data, size))
+    members = {}
+    for key, value in stream.members():
+        if key == 'numbers':
+            members[key] = list(value.items())
+        elif key == 'nested':
+            assert value.skip() == 3
+        else:
+            members[key] = value.value()
+
+    assert members == {key: DOCUMENT[key] for key in ('numbers', 'text', 'Total', 'byYear')}
+
+
+@pytest.mark.parametrize('size', range(1, 8))
+def test_bare_numbers_at_chunk_boundaries(size):
+    """A number cut right before its fraction or exponent is not returned early."""
+    for text in ('{"T":1.5}', '[1.25, 2]', '1.5e10', '[-12, 3E+2, 4e-1]'):
+        stream = JSONStream(chunked(text.encode(), size))
+        if text[0] == '{':
+            assert [(key, value.value()) for key, value in stream.members()] == [('T', 1.5)]
+        elif text[0] == '[':
+            assert list(stream.items()) == json.loads(text)
+        else:
+            assert stream.value() == json.loads(text)
+
+
+@pytest.mark.parametrize('size', range(1, 8))
+def test_pretty_print_stream_matches_parsed(size):
+    """The streaming pretty-printer prints what prettyPrintJSON prints for the parsed document."""
+    data = json.dumps(DOCUMENT).encode()
+    for path in (None, 'numbers', 'nested.deep.0', 'text.1', 'Total', 'byYear.2020.1',
+                 'byYear.2021.7'):
+        for max_depth in (None, 0, 1, 2):
+            expected, actual = io.StringIO(), io.StringIO()
+            prettyPrintJSON(DOCUMENT, 2, expected, max_depth, path)
+            prettyPrintJSONStream(chunked(data, size), 2, actual, max_depth, path)
+            assert actual.getvalue() == expected.getvalue()
+
+
+@pytest.mark.parametrize('path, missing', [
+    ('Bogus', 'Bogus'),
+    ('nested.missing.x', 'nested.missing'),
+    ('numbers.8', 'numbers.8'),
+    ('numbers.first', 'numbers.first'),
+    ('numbers.\u00b2', 'numbers.\u00b2'),
+    ('Total.x', 'Total.x'),
+    ('byYear.2022', 'byYear.2022'),
+])
+def test_missing_path(path, missing):
+    """Both printers raise KeyError naming the part of the path that selects nothing."""
+    data = json.dumps(DOCUMENT).encode()
+    with pytest.raises(KeyError) as parsed:
+        prettyPrintJSON(DOCUMENT, 2, io.StringIO(), None, path)
+    with pytest.raises(KeyError) as streamed:
+        prettyPrintJSONStream(chunked(data, 5), 2, io.StringIO(), None, path)
+    assert parsed.value.args == streamed.value.args == (missing,)
+
+
+@pytest.mark.parametrize('size', range(1, 8))
+def test_summary_events(size):
+    """iterSummary yields the global block and every country in payload order."""
+    summary = syntheticSummary(5)
+    events = list(iterSummary(chunked(json.dumps(summary).encode(), size)))
+
+    assert events[0] == ('Global', summary['Global'])
+    assert [value for key, value in events if key == 'Country'] == summary['Countries']
+
+
+@pytest.mark.parametrize('global_last', [False, True])
+def test_streamed_report_matches_buffered(tmp_path, monkeypatch, global_last):
+    """--stream prints the same report as a buffered fetch, wherever Global sits in the payload."""
+    summary = syntheticSummary(300)
+    if global_last:
+        summary['Global'] = summary.pop('Global')
+    path = tmp_path / 'summary.json'
+    path.write_text(json.dumps(summary))
+
+    with FakeApiServer(summaryFile=str(path)) as api:
+        monkeypatch.setattr(main, 'client', main.CovidClient(covidApi=api.url))
+        monkeypatch.setattr(main, 'summaryCache', None)
+        cases = ((['TotalConfirmed', 'NewConfirmed'], None), (['NewDeaths'], 10), ([], 25))
+        for sort_by, top in cases:
+            reports = []
+            for stream in (False, True):
+                output = io.StringIO()
+                with redirect_stdout(output):
+                    main.printGlobalSummary(sortBy=sort_by, top=top, stream=stream)
+                reports.append(output.getvalue())
+            assert reports[0] == reports[1]
+
+
+def test_truncated_document():
+    """A document that ends early is an error, not a partial value."""
+    with pytest.raises(ValueError):
+        list(JSONStream([b'[1, 2']).items())
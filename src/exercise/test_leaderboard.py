@@ -0,0 +1,93 @@
+"""Incrementally maintained leaderboards against a full sort of every summary."""
+
+import random
+
+import pytest
+
+from leaderboard import Leaderboards, SortedList
+from main import sortCountries
+
+SORT_KEYS = [['NewDeaths'], ['NewDeaths', 'TotalConfirmed'], ['TotalConfirmed', 'NewConfirmed'],
+             ['Country']]
+
+
+def country(code, rng):
+    """A summary row with few distinct NewDeaths values, so ties are common."""
+    return {'Country': f'Country {code}', 'CountryCode': code, 'NewDeaths': rng.randrange(3),
+            'NewConfirmed': rng.randrange(5), 'TotalConfirmed': rng.randrange(20)}
+
+
+def changed(row, rng):
+    """A copy of row with new counts; rows already handed out are never mutated."""
+    return dict(row, NewDeaths=rng.randrange(3),
+                TotalConfirmed=row['TotalConfirmed'] + rng.randrange(3))
+
+
+def next_summary(rows, rng, churn):
+    """Changes, inserts mid-list and removes countries the way upstream refreshes do."""
+    rows = [changed(row, rng) if rng.random() < churn else row for row in rows]
+    for _ in range(rng.randrange(3)):
+        if rows:
+            del rows[rng.randrange(len(rows))]
+    for _ in range(rng.randrange(3)):
+        code = f'N{rng.randrange(400)}'
+        if all(row['CountryCode'] != code for row in rows):
+            rows.insert(rng.randrange(len(rows) + 1), country(code, rng))
+    return rows
+
+
+def test_sorted_list_matches_sorted():
+    """Adds and removes keep the values sorted across sublist splits and merges."""
+    rng = random.Random(1)
+    values = SortedList(load=4)
+    expected = []
+    for _ in range(500):
+        if expected and rng.random() < 0.4:
+            value = rng.choice(expected)
+            expected.remove(value)
+            values.remove(value)
+        else:
+            value = rng.randrange(50)
+            expected.append(value)
+            values.add(value)
+        assert list(values) == sorted(expected)
+        assert list(reversed(values)) == sorted(expected, reverse=True)
+    with pytest.raises(ValueError):
+        values.remove(1000)
+
+
+@pytest.mark.parametrize('rebuild_fraction', [0, 0.1, 2])
+@pytest.mark.parametrize('churn', [0.01, 0.1, 0.5])
+def test_views_match_full_sort(churn, rebuild_fraction):
+    """Views equal sortCountries, ties in payload order, whether updated or rebuilt."""
+    rng = random.Random(churn)
+    rows = [country(f'C{i:03}', rng) for i in range(200)]
+    boards = Leaderboards(rebuildFraction=rebuild_fraction)
+    for _ in range(100):
+        boards.update(rows)
+        for sort_by in SORT_KEYS:
+            assert boards.view(sort_by) == sortCountries(rows, sort_by)
+            assert boards.view(sort_by, 7) == sortCountries(rows, sort_by, 7)
+        rows = next_summary(rows, rng, churn)
+    if rebuild_fraction == 0:
+        assert boards.stats['changed'] == 0 and boards.stats['rebuilds'] > 0
+    elif rebuild_fraction == 2:
+        assert boards.stats['rebuilds'] == 0 and boards.stats['changed'] > 0
+
+
+def test_invalid_and_excess_views():
+    """Unknown or repeated keys are rejected, and old views are evicted."""
+    rng = random.Random(0)
+    boards = Leaderboards(maxViews=2)
+    assert boards.view(['Missing']) == []
+    boards.update([country('AA', rng), country('BB', rng)])
+
+    with pytest.raises(KeyError):
+        boards.view(['Missing'])
+    with pytest.raises(ValueError):
+        boards.view(['NewDeaths', 'NewDeaths'])
+
+    for sort_by in SORT_KEYS:
+        boards.view(sort_by)
+    assert list(boards.boards) == [tuple(key) for key in SORT_KEYS[-2:]]
+    assert boards.stats['evicted'] == len(SORT_KEYS) - 2
@@ -0,0 +1,86 @@
+"""Country cache: LRU eviction, TTL expiry, negative entries for 404s and prewarm."""
+
+import pytest
+
+import main
+from fakeserver import FakeApiServer
+from lrucache import LRUCache
+
+
+class Clock:
+    """A monotonic clock the test moves by hand."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(name='api')
+def fixture_api(monkeypatch):
+    """A fake API server wired into main with an empty country cache."""
+    with FakeApiServer(numCountries=20, unknownCodes=('XX', 'YY')) as server:
+        monkeypatch.setattr(main, 'client', main.CovidClient(countriesApi=server.url,
+                                                             covidApi=server.url))
+        monkeypatch.setattr(main, 'countryCache', LRUCache(maxSize=512))
+        yield server
+
+
+def test_least_recently_used_is_evicted():
+    """Past maxSize the entry read or written longest ago goes first."""
+    cache = LRUCache(maxSize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == (True, 1)
+    cache.put('c', 3)
+    assert 'b' not in cache and 'a' in cache and 'c' in cache
+    assert len(cache) == 2
+    assert cache.get('b') == (False, None)
+    assert cache.stats == {'hits': 1, 'misses': 1, 'evictions': 1}
+
+
+def test_entries_expire_after_their_ttl():
+    """Entries stop being found at their TTL; a per-entry TTL overrides the default."""
+    clock = Clock()
+    cache = LRUCache(ttl=10, clock=clock)
+    cache.put('long', 'x')
+    cache.put('short', None, ttl=2)
+    assert cache.get('short') == (True, None)
+
+    clock.now = 2
+    assert 'short' not in cache
+    assert cache.get('short') == (False, None)
+    assert cache.get('long') == (True, 'x')
+
+    clock.now = 10
+    assert cache.get('long') == (False, None)
+    assert len(cache) == 0
+
+
+def test_unknown_country_is_cached_as_none(api):
+    """A 404 is remembered for NOT_FOUND_TTL so the code is asked for only once."""
+    assert main.getCountryData('xx') is None
+    assert main.getCountryData('XX') is None
+    assert api.requests['/alpha'] == 1
+
+    found, data = main.countryCache.get('XX')
+    assert found and data is None
+    assert main.countryCache.entries['XX'][1] <= main.countryCache.clock() + main.NOT_FOUND_TTL
+
+    assert main.getCountryData('AB')['alpha2Code'] == 'AB'
+    assert main.getCountryData('AB')['alpha2Code'] == 'AB'
+    assert api.requests['/alpha'] == 2
+
+
+def test_prewarm_fills_the_cache(api):
+    """prewarm fetches known and unknown codes so later lookups make no request."""
+    main.prewarm(['AA', 'ab', 'AC', 'YY'])
+    requests = api.requests['/alpha']
+    assert requests == 1
+
+    assert main.getCountryData('AA')['alpha2Code'] == 'AA'
+    assert main.getCountryData('AB')['alpha2Code'] == 'AB'
+    assert main.getCountryData('YY') is None
+    assert main.getCountriesData(['AC', 'YY']) == {'AC': main.countryCache.get('AC')[1], 'YY': None}
+    assert api.requests['/alpha'] == requests
@@ -0,0 +1,53 @@
+"""Command line: bad options and --json paths are usage errors, not tracebacks."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from client import COVID_API
+from httpcache import DiskCache
+
+
+def run_main(*args, cache_dir=None):
+    """Runs main.py with args, and with no summary cache unless cache_dir is given."""
+    cache = ['--cache-dir', str(cache_dir)] if cache_dir else ['--no-cache']
+    return subprocess.run([sys.executable, 'main.py', *args, *cache],
+                          cwd=Path(__file__).parent, capture_output=True, text=True, timeout=30,
+                          check=False)
+
+
+@pytest.mark.parametrize('args', [
+    ['--sort-by', 'Bogus'],
+    ['--sort-by', 'NewDeaths', 'Population'],
+    ['--top', '-1'],
+    ['--top', '-1', '--sort-by'],
+])
+def test_cli_rejects_bad_sorting(args):
+    """Unknown sort keys and a negative --top are usage errors, not tracebacks."""
+    result = run_main(*args)
+    assert result.returncode == 2
+    assert 'error: ' in result.stderr and 'Traceback' not in result.stderr
+
+
+@pytest.mark.parametrize('rate', ['0', '-2'])
+def test_cli_rejects_non_positive_rate_limit(rate):
+    """--rate-limit must be positive; 0 used to fail deep inside the token bucket."""
+    result = run_main('--rate-limit', rate)
+    assert result.returncode == 2
+    assert '--rate-limit must be positive' in result.stderr
+
+
+@pytest.mark.parametrize('path, expected', [('Bogus', "no 'Bogus'"), ('2020.x', "no '2020.x'")])
+def test_cli_reports_missing_json_path(tmp_path, path, expected):
+    """A --json path that is not in the summary is a usage error, read from a fresh cache."""
+    cache = DiskCache(str(tmp_path))
+    cache.store(f'{COVID_API}/summary', json.dumps({'2020': {'Countries': []}}).encode(), {})
+    result = run_main('--json', path, cache_dir=tmp_path)
+    assert result.returncode == 2
+    assert expected in result.stderr and 'Traceback' not in result.stderr
+
+    result = run_main('--json', '2020', cache_dir=tmp_path)
+    assert result.returncode == 0 and json.loads(result.stdout) == {'Countries': []}
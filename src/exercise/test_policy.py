@@ -0,0 +1,68 @@
+"""Retry budget capped at maxRetryTokens, per-endpoint hedge delays and hedged exits."""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from policy import RequestPolicy, endpoint
+
+
+class Response:
+    """Just enough of a requests.Response for the policy."""
+
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+    def close(self):
+        """Responses that are retried get closed."""
+
+
+def test_retry_budget_is_capped():
+    """The budget starts at maxRetryTokens and never grows past it."""
+    policy = RequestPolicy(retries=100, backoffBase=0, retryBudget=0.5, maxRetryTokens=3)
+    assert policy.execute(lambda: Response(503)).status_code == 503
+    assert policy.stats['retries'] == 3 and policy.stats['budgetExhausted'] == 1
+
+    for _ in range(20):
+        policy.execute(lambda: Response(200))
+    assert policy.retryTokens == 3
+
+
+HEDGED_RUN = '''
+import itertools, time
+from test_policy import Response
+from policy import RequestPolicy
+
+calls = itertools.count()
+
+def send():
+    if next(calls) == 0:
+        time.sleep(5)
+    return Response(200)
+
+policy = RequestPolicy(hedge=True, hedgeDelay=0.05)
+assert policy.execute(send, 'http://api/summary').status_code == 200
+assert policy.stats['hedgeWins'] == 1
+'''
+
+
+def test_losing_hedge_does_not_delay_exit():
+    """The process exits once the winner answers, not when the stalled loser does."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', HEDGED_RUN], cwd=Path(__file__).parent, check=True,
+                   timeout=30)
+    assert time.perf_counter() - start < 3
+
+
+def test_hedge_delay_is_per_endpoint():
+    """Slow summary downloads do not raise the hedge delay of country lookups."""
+    policy = RequestPolicy(minSamples=5, hedgeDelay=1.0)
+    for _ in range(10):
+        policy.execute(lambda: time.sleep(0.02) or Response(200), 'http://api/summary')
+        policy.execute(lambda: Response(200), 'http://api/alpha/DE')
+    policy.execute(lambda: Response(200), 'http://api/alpha/FR')
+    assert policy.hedgeDelay(endpoint('http://api/summary')) >= 0.02
+    assert policy.hedgeDelay(endpoint('http://api/alpha/DE')) < 0.01
+    assert len(policy.latencies[endpoint('http://api/alpha/FR')]) == 11
+    assert policy.hedgeDelay(endpoint('http://other/alpha/DE')) == 1.0
@@ -0,0 +1,118 @@
+"""Token buckets: refill, bursts, queued reservations, pauses and Retry-After."""
+
+import asyncio
+import threading
+import time
+from email.utils import formatdate
+
+import pytest
+
+import ratelimit
+from ratelimit import RateLimiter, TokenBucket, retryAfterSeconds
+
+
+class Clock:
+    """A monotonic clock the test moves by hand."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_burst_then_refill():
+    """A full bucket serves capacity requests at once, then one per 1/rate."""
+    clock = Clock()
+    bucket = TokenBucket(rate=4, capacity=2, clock=clock)
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 0.25, 0.5]
+
+    clock.now += 10
+    assert bucket.tokens == -2 and bucket.reserve() == 0
+    assert bucket.tokens == 1
+    assert bucket.stats['acquired'] == 5 and bucket.stats['waited'] == 2
+    assert bucket.stats['totalWait'] == 0.75 and bucket.stats['maxWait'] == 0.5
+
+
+def test_concurrent_reservations_queue_in_order():
+    """Threads reserving at the same instant get distinct, evenly spaced slots."""
+    bucket = TokenBucket(rate=10, capacity=1, clock=Clock())
+    waits = []
+    lock = threading.Lock()
+
+    def reserve():
+        for _ in range(50):
+            wait = bucket.reserve()
+            with lock:
+                waits.append(wait)
+
+    threads = [threading.Thread(target=reserve) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(waits) == pytest.approx([i / 10 for i in range(400)])
+
+
+def test_pause_drops_saved_burst():
+    """After a Retry-After pause no token is handed out before it ends."""
+    clock = Clock()
+    bucket = TokenBucket(rate=2, capacity=5, clock=clock)
+    bucket.pause(3)
+    # A shorter pause than the one in force does not bring it forward.
+    bucket.pause(1)
+    assert bucket.reserve() == pytest.approx(3.5)
+
+    clock.now += 3.5
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.stats['pauses'] == 2
+
+
+def test_acquire_async_sleeps_for_its_slot(monkeypatch):
+    """Tasks wait on asyncio.sleep for their reservation, in order."""
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+
+    monkeypatch.setattr(asyncio, 'sleep', fake_sleep)
+    limiter = RateLimiter(rate=5, burst=1, clock=Clock())
+
+    async def run():
+        await asyncio.gather(*(limiter.acquireAsync('http://api/alpha/DE') for _ in range(3)))
+
+    asyncio.run(run())
+    assert slept == pytest.approx([0.2, 0.4])
+    assert limiter.stats() == {'api': {'acquired': 3, 'waited': 2, 'totalWait': pytest.approx(0.6),
+                                       'maxWait': pytest.approx(0.4), 'pauses': 0}}
+
+
+def test_buckets_are_per_host():
+    """Hosts are limited independently, with per-host limits where given."""
+    limiter = RateLimiter(rate=1, burst=1, limits={'slow': (0.5, 1)}, clock=Clock())
+    assert limiter.bucket('http://a/x') is limiter.bucket('http://a/y')
+    assert limiter.bucket('http://a/x') is not limiter.bucket('http://b/x')
+    assert limiter.bucket('https://slow/x').rate == 0.5
+
+
+@pytest.mark.parametrize('rate', [0, -1])
+def test_rejects_non_positive_rate(rate):
+    """A rate of zero or less is a ValueError, not a later ZeroDivisionError."""
+    with pytest.raises(ValueError, match='rate must be positive'):
+        TokenBucket(rate, 1)
+    with pytest.raises(ValueError, match='rate must be positive'):
+        RateLimiter(rate=rate)
+    with pytest.raises(ValueError, match='rate must be positive'):
+        RateLimiter(limits={'api': (rate, 1)})
+
+
+def test_retry_after_seconds(monkeypatch):
+    """Retry-After is read as seconds or as an HTTP date, never negative."""
+    now = time.time()
+    monkeypatch.setattr(ratelimit.time, 'time', lambda: now)
+    assert retryAfterSeconds(None) is None
+    assert retryAfterSeconds('2.5') == 2.5
+    assert retryAfterSeconds('-3') == 0
+    assert retryAfterSeconds(formatdate(now + 30, usegmt=True)) == pytest.approx(30, abs=1)
+    assert retryAfterSeconds(formatdate(now - 30, usegmt=True)) == 0
+    assert retryAfterSeconds('soon') is None
@@ -0,0 +1,85 @@
+"""Column stores: CountryTable and snapshot files round-trip rows, globals and sort order."""
+
+import pytest
+
+from columns import NUMERIC_KEYS, STRING_KEYS, CountryTable
+from fakeserver import syntheticSummary
+from main import sortCountries
+from snapshot import HEADER, MAGIC, VERSION, SnapshotTable, writeSnapshot
+
+SORT_KEYS = [['TotalConfirmed', 'NewConfirmed'], ['NewDeaths'], ['Country'], ['Date', 'Slug']]
+
+
+def sample_rows(count):
+    """Synthetic rows with just the stored keys, some names outside ASCII."""
+    rows = [{key: row[key] for key in STRING_KEYS + NUMERIC_KEYS}
+            for row in syntheticSummary(count)['Countries']]
+    for row, name in zip(rows, ['Côte d’Ivoire', '日本', 'Ελλάδα', 'Türkiye']):
+        row['Country'] = name
+    return rows
+
+
+@pytest.fixture(name='open_table', params=['columns', 'snapshot'])
+def fixture_open_table(request, tmp_path):
+    """Builds a CountryTable or writes and maps a snapshot for the given rows."""
+    tables = []
+
+    def open_table(global_cases, rows):
+        if request.param == 'columns':
+            return CountryTable.fromRows(rows)
+        path = str(tmp_path / 'summary.snap')
+        writeSnapshot(path, global_cases, rows)
+        table = SnapshotTable(path)
+        tables.append(table)
+        assert table.globalCases == {**dict.fromkeys(table.numeric, 0), **global_cases}
+        return table
+
+    yield open_table
+    for table in tables:
+        table.close()
+
+
+@pytest.mark.parametrize('count', [0, 1, 37])
+def test_round_trip(open_table, count):
+    """Every cell reads back as written, in order, non-ASCII strings included."""
+    rows = sample_rows(count)
+    summary = {key: sum(row[key] for row in rows) for key in syntheticSummary(0)['Global']}
+    table = open_table(summary, rows)
+    assert len(table) == count
+    assert [row.asDict() for row in table] == rows
+    if count:
+        assert table[-1].asDict() == rows[-1]
+    with pytest.raises(IndexError):
+        table[count]
+
+
+def test_sorted_rows_match_sort_countries(open_table):
+    """sortedRows orders like sortCountries on plain rows, with and without top."""
+    rows = sample_rows(60)
+    for i, row in enumerate(rows):
+        row['NewDeaths'] = i % 4
+    table = open_table({}, rows)
+    for sort_by in SORT_KEYS:
+        for top in (None, 0, 5, 100):
+            expected = sortCountries(rows, sort_by, top)
+            assert [row.asDict() for row in sortCountries(table, sort_by, top)] == expected
+
+
+def test_country_table_interns_strings():
+    """Repeated strings are stored once and missing keys default to 0 and ''."""
+    table = CountryTable.fromRows([{'Date': 'd', 'Country': 'A'}, {'Date': 'd', 'NewDeaths': 3}])
+    assert table.strings == ['A', '', 'd']
+    assert table[1]['Country'] == '' and table[1]['NewDeaths'] == 3 and table[0]['NewDeaths'] == 0
+
+
+@pytest.mark.parametrize('magic, version', [(b'NOPE', VERSION), (MAGIC, VERSION + 1)])
+def test_rejects_other_files(tmp_path, magic, version):
+    """A file with the wrong magic number or format version is a ValueError."""
+    path = tmp_path / 'summary.snap'
+    writeSnapshot(str(path), {}, sample_rows(3))
+    data = bytearray(path.read_bytes())
+    fields = list(HEADER.unpack_from(data))
+    HEADER.pack_into(data, 0, magic, version, *fields[2:])
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match='not a version'):
+        SnapshotTable(str(path))
@@ -0,0 +1,39 @@
+"""Display widths and clipping for combining marks and East Asian wide characters."""
+
+import pytest
+
+from textwidth import clip, displayWidth, padLeft
+
+
+@pytest.mark.parametrize('text, width', [
+    ('', 0),
+    ('Germany', 7),
+    ('Côte d’Ivoire', 13),
+    ('Cote\u0302 d’Ivoire', 13),
+    ('e\u0301\u0301', 1),
+    ('日本', 4),
+    ('中国 China', 10),
+    ('\uff21\uff22', 4),
+    ('a\u200bb', 2),
+])
+def test_display_width(text, width):
+    """Combining marks and zero-width spaces take no column, wide characters two."""
+    assert displayWidth(text) == width
+    assert displayWidth(padLeft(text, 15)) == 15
+
+
+@pytest.mark.parametrize('text, width, clipped', [
+    ('Germany', 3, 'Ger'),
+    ('Germany', -1, ''),
+    ('Germany', 20, 'Germany'),
+    ('Cote\u0302 d', 4, 'Cote\u0302'),
+    ('e\u0301x', 1, 'e\u0301'),
+    ('日本国', 4, '日本'),
+    ('日本国', 3, '日'),
+    ('日本国', 1, ''),
+    ('a日b', 2, 'a'),
+])
+def test_clip(text, width, clipped):
+    """clip keeps combining marks with their base and never splits a wide character."""
+    assert clip(text, width) == clipped
+    assert displayWidth(clipped) <= max(width, 0)
@@ -0,0 +1,101 @@
+# Display width per code point, expanded on first use from the ranges in
+# widthtable.py: 0 for combining and format characters, 2 for East Asian wide
+# and fullwidth characters, 1 for everything else.
+table = None
+cache = {}
+CACHE_SIZE = 1 << 16
+
+def buildTable():
+  from widthtable import WIDE, ZERO_WIDTH
+
+  widths = bytearray(b'\x01') * 0x110000
+  for start, stop in ZERO_WIDTH:
+    widths[start:stop + 1] = bytes(stop + 1 - start)
+  for start, stop in WIDE:
+    widths[start:stop + 1] = b'\x02' * (stop + 1 - start)
+  return widths
+
+def displayWidth(text):
+  # Terminal columns taken by text. ASCII text is as wide as it is long;
+  # anything else is summed through the table once and then cached, since
+  # the same country names come up in every report.
+  if text.isascii():
+    return len(text)
+  width = cache.get(text)
+  if width is None:
+    global table
+    if table is None:
+      table = buildTable()
+    width = sum(map(table.__getitem__, map(ord, text)))
+    if len(cache) >= CACHE_SIZE:
+      cache.clear()
+    cache[text] = width
+  return width
+
+def padLeft(text, width):
+  # str.rjust by display width.
+  return ' ' * (width - displayWidth(text)) + text
+
+def clip(text, width):
+  # The longest prefix of text at most width columns wide.
+  if text.isascii():
+    return text[:max(width, 0)]
+  total = 0
+  for end, char in enumerate(text):
+    total += displayWidth(char)
+    if total > width:
+      return text[:end]
+  return text
+
+def widthOf(char):
+  import unicodedata
+
+  if unicodedata.category(char) == 'Cn':
+    return None
+  if char == '\u00ad':
+    return 1
+  if unicodedata.category(char) in ('Mn', 'Me', 'Cf') or char == '\u200b' or \
+     '\u1160' <= char <= '\u11ff':
+    return 0
+  if unicodedata.east_asian_width(char) in ('W', 'F'):
+    return 2
+  return 1
+
+def generate():
+  # Runs of code points of width 0 and 2 in this Python's Unicode database.
+  # Unassigned code points take the width of the run around them.
+  ranges = {0: [], 2: []}
+  start, current, last = 0, 1, 0
+  for codePoint in range(0x110000):
+    width = widthOf(chr(codePoint))
+    if width is None:
+      continue
+    if width != current:
+      if current != 1:
+        ranges[current].append((start, last))
+      start, current = codePoint, width
+    last = codePoint
+  if current != 1:
+    ranges[current].append((start, last))
+  return ranges
+
+def formatRanges(name, ranges, perLine=4):
+  lines = [f'{name} = (']
+  for i in range(0, len(ranges), perLine):
+    lines.append('  ' + ' '.join(f'(0x{start:05X}, 0x{stop:05X}),'
+                                 for start, stop in ranges[i:i + perLine]))
+  lines.append(')')
+  return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+  import os
+  import unicodedata
+
+  ranges = generate()
+  path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'widthtable.py')
+  with open(path, 'w') as f:
+    f.write(f'# Generated by textwidth.py from Unicode {unicodedata.unidata_version}; '
+            f'do not edit.\n\n'
+            f'{formatRanges("ZERO_WIDTH", ranges[0])}\n\n{formatRanges("WIDE", ranges[2])}\n')
+  print(f'Wrote {len(ranges[0])} zero-width and {len(ranges[2])} wide ranges to {path}')